@@ -1,4 +1,4 @@
-import hashlib
+import asyncio
 import secrets
 from typing import Tuple
 import datetime
@@ -24,7 +24,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 def revoke_token(token: str, token_type: str, db: Session, expires_at: datetime = None):
     """Add token to revocation list"""
-    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    token_hash = hash_token(token)
     if not expires_at:
         expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=3600) # Default 1 hr
     revoked_token = RevokedToken(
@@ -95,7 +95,7 @@ async def signup(user_in: UserCreate, db: Session = Depends(get_db), _: Tuple =
             email=user_in.email,
             accepted_terms=user_in.accepted_terms
         )
-        user.set_password(user_in.password)
+        await asyncio.to_thread(user.set_password, user_in.password)
         db.add(user)
         db.commit()
         db.refresh(user)
@@ -228,7 +228,7 @@ async def token(request: Request,login_request: LoginRequest = Form(), db: Sessi
         
         user: User = db.execute(select(User).where(User.email == login_request.username)).scalars().first()
         
-        if not user or not user.verify_password(login_request.password):
+        if not user or not await asyncio.to_thread(user.verify_password, login_request.password):
             raise HTTPException(status.HTTP_401_UNAUTHORIZED,detail="Invalid Username or Password")
         
         if user.is_locked:
@@ -398,7 +398,7 @@ async def revoke_token_endpoint(revoke_token_request: RevokeTokenRequest,db: Ses
     """
     try:
         if revoke_token_request.token_type_hint == "refresh_token":
-            token_hash = hashlib.sha256(revoke_token_request.token.encode()).hexdigest()
+            token_hash = hash_token(revoke_token_request.token)
             refresh_token_obj = db.query(RefreshToken).filter(
                 RefreshToken.token_hash == token_hash
             ).first()
@@ -476,7 +476,7 @@ async def reset_password(reset_password_request: ResetPasswordRequest, db: Sessi
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid or Expired Reset Token"
         )
-    user.set_password(reset_password_request.new_password)
+    await asyncio.to_thread(user.set_password, reset_password_request.new_password)
     db.add(user)    
     db.query(PasswordResetToken).filter(
         PasswordResetToken.id == reset_token.id
@@ -504,12 +504,12 @@ async def change_password(request: Request, password_update: PasswordUpdate, cur
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"message": "New password does not meet requirements", "errors": errors}
         )
-    if not current_user.verify_password(password_update.current_password):
+    if not await asyncio.to_thread(current_user.verify_password, password_update.current_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect current password"
         )
-    current_user.set_password(password_update.new_password)
+    await asyncio.to_thread(current_user.set_password, password_update.new_password)
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
@@ -637,7 +637,7 @@ async def google_callback(request: Request, google_callback_data: GoogleCallback
             is_active=True,
             is_verified=True,
         )
-        user.set_password(secrets.token_urlsafe(10))
+        await asyncio.to_thread(user.set_password, secrets.token_urlsafe(10))
         for perm in normal_user_permissions:
             if perm not in user.scopes:
                 user.scopes.append(perm)
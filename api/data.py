@@ -4,7 +4,7 @@ import os
 from uuid import UUID
 from typing import List, Dict
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from models import FieldType, User, Project
@@ -74,16 +74,20 @@ async def get_project_data(
         })
     return receipt_data
 
-def save_csv(project: Project):
+def save_csv(db: Session, project: Project):
     path: str = f"{project.id}.csv"
     data = []
-    for receipt in project.receipts:
+    fields = {field.id: field for field in db.scalars(select(Field).where(Field.project_id == project.id))}
+    receipts = db.scalars(
+        select(Receipt).where(Receipt.project_id == project.id).options(selectinload(Receipt.data_values))
+    ).all()
+    for receipt in receipts:
         row = {
             "receipt_id": str(receipt.id),
             "receipt_path": receipt.file_path
         }
         for dv in receipt.data_values:
-            row[dv.fully_name] = dv.value
+            row[dv.fully_name_in(fields)] = dv.value
         data.append(row)
     with open(path,mode="w", newline="") as output:
         writer = csv.writer(output, delimiter=',',quotechar='|', quoting=csv.QUOTE_MINIMAL)
@@ -117,7 +121,7 @@ async def export_project_data_csv(
             detail="Not authorized to export data from this project"
         )
     try:
-        file = save_csv(project)
+        file = save_csv(db, project)
         storage = StorageService()
         export_storage_path = storage.upload_export(project_id=project.id,file=file,filename="data_export.csv")
         return {
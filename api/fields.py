@@ -1,10 +1,10 @@
 from uuid import UUID
 from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from api import ListResponse
-from models import User, Field, Project
+from models import MAX_FIELD_DEPTH, User, Field, Project
 from schemas import AddFieldRequest, UpdateFieldRequest, FieldResponse
 from utils import get_obj_or_404, paginate, get_db, get_query_params, require_scope, require_subscription
 
@@ -98,6 +98,7 @@ async def list_fields(
         db=db,
         model=Field,
         schema=FieldResponse,
+        options=(selectinload(Field.children, recursion_depth=MAX_FIELD_DEPTH),),
         **params
     )
 
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Any, Dict, List
 
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, undefer
 from models.subscriptions import Payment
 from utils import get_obj_or_404, paginate, require_subscription
 from schemas import FieldResponse
@@ -11,12 +11,20 @@ from models.projects import Project, Receipt
 from schemas import ListResponse
 from schemas.projects import ProjectCreate, ProjectResponse, ProjectUpdate
 from schemas.receipts import ReceiptResponse
-from models import User
+from models import Field, User
 from uuid import UUID
 from config import settings
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# relationships and the deferred receipts count ProjectResponse serialises,
+# loaded up front instead of lazily per project/field
+PROJECT_RESPONSE_OPTIONS = (
+    undefer(Project.receipts_count),
+    selectinload(Project.owner),
+    selectinload(Project.fields).selectinload(Field.children),
+)
+
 @router.post("", response_model=ProjectResponse)
 async def create_project(
     project_in: ProjectCreate,
@@ -33,8 +41,7 @@ async def create_project(
     )
     db.add(project)
     db.commit()
-    db.refresh(project)
-    return project
+    return await get_obj_or_404(db=db, model=Project, id=project.id, options=PROJECT_RESPONSE_OPTIONS)
 
 @router.get("", response_model=ListResponse)
 async def list_filter_search_projects(
@@ -51,6 +58,7 @@ async def list_filter_search_projects(
         db=db,
         model=Project,
         schema=ProjectResponse,
+        options=PROJECT_RESPONSE_OPTIONS,
         **params
     )
 
@@ -66,7 +74,8 @@ async def get_project(
     project: Project = await get_obj_or_404(
         db=db,
         model=Project,
-        id=project_id
+        id=project_id,
+        options=PROJECT_RESPONSE_OPTIONS
     )
     if project.owner != current_user and not current_user.has_scope("admin"):
         raise HTTPException(
@@ -99,8 +108,7 @@ async def update_project(
     project.description = project_update_in.description or project.description
     db.add(project)
     db.commit()
-    db.refresh(project)
-    return project
+    return await get_obj_or_404(db=db, model=Project, id=project.id, options=PROJECT_RESPONSE_OPTIONS)
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
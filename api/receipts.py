@@ -2,7 +2,7 @@ import io
 from typing import Any, Dict
 from uuid import UUID
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from models import DataValue, User, Project, Receipt
@@ -211,7 +211,7 @@ async def process_receipt(
     fields = [FieldResponse.model_validate(field).model_dump() for field in project.fields if not field.parent]
     receipt.process(db=db,extractor=extractor, fields=fields)
     db.refresh(receipt)
-    payment: Payment | None = db.execute(select(Payment).where(Payment.user_id == current_user.id,Payment.subscription_end_at > func.now())).scalar_one_or_none()
+    payment: Payment | None = db.execute(select(Payment).where(Payment.user_id == current_user.id,Payment.is_active)).scalar_one_or_none()
     payment.invoices_processed += 1
     db.commit()
     return receipt
@@ -3,7 +3,7 @@ import json
 from uuid import UUID
 from typing import Any, Dict, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from api import ListResponse
@@ -76,7 +76,7 @@ async def start_payment(
     payment: Payment | None = db.execute(select(Payment).where(
             Payment.subscription_plan_id == plan.id,
             Payment.user_id == user.id,
-            Payment.subscription_end_at > func.now()  # Check if subscription is active
+            Payment.is_active
         )).scalar_one_or_none()
     if payment:
         raise HTTPException(
@@ -148,7 +148,6 @@ async def complete_payment(request: Request, db: Session = Depends(get_db)):
                 payment = Payment.create_from_paystack_response(user_id=user.id, data=data)
                 db.add(payment)
                 db.commit()
-                db.refresh(payment)
 
         case "invoice.create":
             """ 
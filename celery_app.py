@@ -3,9 +3,10 @@ from typing import Tuple
 
 import resend
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from config import settings, logger
+from config import settings, logger, start_log_listener, stop_log_listener
 
 resend.api_key = settings.resend_api_key
 app = Celery(
@@ -23,6 +24,15 @@ app.conf.update(
     enable_utc=True,
 )
 
+@worker_process_init.connect
+def start_worker_logging(**kwargs):
+    # prefork children are forked after this module is imported, so each starts its own listener thread
+    start_log_listener()
+
+@worker_process_shutdown.connect
+def stop_worker_logging(**kwargs):
+    stop_log_listener()
+
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 jinja_env = Environment(
     loader=FileSystemLoader(TEMPLATES_DIR),
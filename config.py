@@ -1,4 +1,8 @@
 import logging
+import logging.handlers
+import queue
+from functools import cached_property, lru_cache
+from typing import List, NamedTuple, Tuple
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -16,6 +20,7 @@ class Settings(BaseSettings):
     refresh_token_length: int = 128
     refresh_token_expiry_seconds: int = 2592000 # 30 days
     frontend_url: str = ""
+    cors_origins: List[str] = ["http://localhost:3000", "https://receiptiq.co"]
     postgres_user: str = ""
     postgres_password: str = ""
     postgres_db: str = ""
@@ -43,56 +48,90 @@ class Settings(BaseSettings):
     google_client_secret: str = ""
     google_redirect_uri: str = ""
     
-    @property
+    @cached_property
     def database_url(self) -> str:
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings():
+    return Settings()
+
+settings = get_settings()
 
 logger = logging.getLogger('ReceiptIQ')
-file_handler = logging.FileHandler("receiptiq.log", encoding="utf-8")
+file_handler = logging.handlers.RotatingFileHandler("receiptiq.log", maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
 file_handler.setLevel(logging.ERROR)
 file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 logger.addHandler(file_handler)
+# Once started, request handlers only enqueue records and the listener thread does the file I/O.
+# Threads do not survive fork, so each serving process starts its own listener (FastAPI lifespan,
+# Celery worker_process_init); until then records go straight to the file handler
+log_queue: queue.Queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setLevel(logging.ERROR)
+
+def start_log_listener() -> None:
+    log_listener.start()
+    logger.removeHandler(file_handler)
+    logger.addHandler(queue_handler)
+
+def stop_log_listener() -> None:
+    logger.removeHandler(queue_handler)
+    logger.addHandler(file_handler)
+    # flushes whatever is still queued
+    log_listener.stop()
 
-permissions = [
-    ('Admin','admin'),
-    ('Read Profile','read:profile'),
-    ('Update Profile and Password','write:profile'),
-    ('Read Projects','read:projects'),
-    ('Create/Update Projects','write:projects'),
-    ('Delete Projects','delete:projects'),
-    ('Process Projects','process:projects'),
-    ('Read Fields','read:fields'),
-    ('Create/Update Fields','write:fields'),
-    ('Delete Fields','delete:fields'),
-    ('Read Receipts','read:receipts'),
-    ('Create/Update Receipts','write:receipts'),
-    ('Delete Receipts','delete:receipts'),
-    ('Read Data','read:data'),
-    ('Update Data','write:data'),
-    ('Export Data','export:data'),
-]
+class PermissionSpec(NamedTuple):
+    name: str
+    codename: str
 
-subscription_plans = [
-    ('Free Trial', 'Get a taste of ReceiptIQ - up to 1,000 invoices/month', 0.00, "USD", "monthly", 30, "ACTIVE", [
+class PlanSpec(NamedTuple):
+    name: str
+    description: str
+    price: float
+    currency: str
+    billing_interval: str
+    trial_period_days: int
+    status: str
+    benefits: Tuple[str, ...] = ()
+    invoice_limits: int = 0
+
+permissions: Tuple[PermissionSpec, ...] = (
+    PermissionSpec('Admin','admin'),
+    PermissionSpec('Read Profile','read:profile'),
+    PermissionSpec('Update Profile and Password','write:profile'),
+    PermissionSpec('Read Projects','read:projects'),
+    PermissionSpec('Create/Update Projects','write:projects'),
+    PermissionSpec('Delete Projects','delete:projects'),
+    PermissionSpec('Process Projects','process:projects'),
+    PermissionSpec('Read Fields','read:fields'),
+    PermissionSpec('Create/Update Fields','write:fields'),
+    PermissionSpec('Delete Fields','delete:fields'),
+    PermissionSpec('Read Receipts','read:receipts'),
+    PermissionSpec('Create/Update Receipts','write:receipts'),
+    PermissionSpec('Delete Receipts','delete:receipts'),
+    PermissionSpec('Read Data','read:data'),
+    PermissionSpec('Update Data','write:data'),
+    PermissionSpec('Export Data','export:data'),
+)
+
+subscription_plans: Tuple[PlanSpec, ...] = (
+    PlanSpec('Free Trial', 'Get a taste of ReceiptIQ - up to 1,000 invoices/month', 0.00, "USD", "monthly", 30, "ACTIVE", (
         "Up to 1,000 invoices/month",
         "1 project",
         "Custom Schema"
-    ],1000),
-    ('Pro Monthly', 'For freelancers & small teams — up to 5,000 invoices/month', 5.00, "USD", "monthly", 0, "ACTIVE", [
+    ),1000),
+    PlanSpec('Pro Monthly', 'For freelancers & small teams — up to 5,000 invoices/month', 5.00, "USD", "monthly", 0, "ACTIVE", (
         "Everything in Free Trial",
         "5,000 invoices/month",
         "Unlimited projects",
         "24/7 email support",
-    ],5000),
-    ('Pro Annual', 'For freelancers & small teams — up to 5,000 invoices/month', 48.00, "USD", "annually", 0, "ACTIVE",[
+    ),5000),
+    PlanSpec('Pro Annual', 'For freelancers & small teams — up to 5,000 invoices/month', 48.00, "USD", "annually", 0, "ACTIVE",(
         "Everything in Free Trial",
         "5,000 invoices/month",
         "Unlimited projects",
         "24/7 email support",
-    ],5000)
-]
-
-def get_settings():
-    return Settings()
+    ),5000)
+)
@@ -1,27 +1,20 @@
-from datetime import datetime, timezone
-from sqlalchemy import func, select
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from api import timedelta
 from models import BillingInterval, Permission, PlanStatus,SubscriptionPlan, User, Payment
-from utils import create_paystack_subscription_plan, get_paystack_plans, get_db
-from config import logger, permissions, subscription_plans, get_settings
+from utils import create_paystack_subscription_plan, get_paystack_plans, session_local
+from config import logger, permissions, subscription_plans, settings
 
 
 def create_permissions(db: Session):
-    for perm_name, perm_code in permissions:
-        if not db.execute(
-            select(Permission).where(Permission.codename == perm_code)
-        ).scalar_one_or_none():
-            permission = Permission(name=perm_name, codename=perm_code)
-            db.add(permission)
-            db.commit()
-
-def get_first_or_none(iterable, condition):
-    return next(filter(condition, iterable), None)
+    db.execute(
+        insert(Permission).on_conflict_do_nothing(index_elements=["codename"]),
+        [permission._asdict() for permission in permissions]
+    )
 
 def create_default_admin_user(db:Session):
-    settings = get_settings()
     logger.info("Adding admin user")
     admin_user = db.execute(select(User).where(User.email == settings.admin_email)).scalar_one_or_none()
     if not admin_user:
@@ -35,8 +28,7 @@ def create_default_admin_user(db:Session):
         permission = db.execute(select(Permission).where(Permission.codename == "admin")).scalar_one_or_none()
         admin_user.scopes.append(permission)
         db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+        db.flush()
     annual_plan = db.execute(select(SubscriptionPlan).where(SubscriptionPlan.billing_interval == BillingInterval.ANNUALLY, SubscriptionPlan.status == PlanStatus.ACTIVE)).scalar_one_or_none()
     payment_payload = {
         "event": "charge.success",
@@ -49,54 +41,57 @@ def create_default_admin_user(db:Session):
             "status": "success"
         }
     }
-    trump_payment = db.execute(select(Payment).where(Payment.transaction_id == payment_payload.get("data").get("id"))).scalar_one_or_none()
-    if not trump_payment:
+    trump_payment_exists = db.scalar(select(exists().where(Payment.transaction_id == payment_payload.get("data").get("id"))))
+    if not trump_payment_exists:
         data = payment_payload.get("data")
         data["subscription_plan_id"] = annual_plan.id
         data["subscription_start_at"] = datetime.now(timezone.utc)
         data["subscription_end_at"] = datetime.now(timezone.utc) + timedelta(days=730) # two years
         trump_payment = Payment.create_from_paystack_response(admin_user.id, data=data)
         db.add(trump_payment)
-        db.commit()
-        db.refresh(trump_payment)
     logger.info("Admin User ADDED")
 
 
 def create_subscription_plans(db: Session):
-    for (name,descr,price,currency,billing_interval,trial_period_days,status,benefits,invoice_limits) in subscription_plans:
-        paystack_plan = get_first_or_none(get_paystack_plans(), lambda p: p["name"] == name and not p["is_deleted"])
+    paystack_plans = {}
+    for plan in get_paystack_plans():
+        if not plan["is_deleted"]:
+            paystack_plans.setdefault(plan["name"], plan)
+    existing_plans = {
+        (plan.name, plan.billing_interval): plan
+        for plan in db.execute(select(SubscriptionPlan).where(SubscriptionPlan.status == PlanStatus.ACTIVE)).scalars()
+    }
+    new_plans = []
+    for spec in subscription_plans:
+        paystack_plan = paystack_plans.get(spec.name)
         if not paystack_plan:
-            paystack_plan = create_paystack_subscription_plan(name=name, interval=billing_interval, amount=price if trial_period_days == 0 else 1.00, currency=currency)
+            paystack_plan = create_paystack_subscription_plan(name=spec.name, interval=spec.billing_interval, amount=spec.price if spec.trial_period_days == 0 else 1.00, currency=spec.currency)
         
-        db_plan = db.execute(select(SubscriptionPlan).where(
-            SubscriptionPlan.name == name,
-            SubscriptionPlan.billing_interval == BillingInterval(billing_interval), 
-            SubscriptionPlan.status == PlanStatus.ACTIVE
-        )).scalar_one_or_none()
+        db_plan = existing_plans.get((spec.name, BillingInterval(spec.billing_interval)))
         if not db_plan:
-            db_plan = SubscriptionPlan(
-                name=name,
-                description=descr,
-                benefits="$".join(benefits),
-                invoice_limits=invoice_limits,
+            new_plans.append(SubscriptionPlan(
+                name=spec.name,
+                description=spec.description,
+                benefits="$".join(spec.benefits),
+                invoice_limits=spec.invoice_limits,
                 plan_code=paystack_plan.get("plan_code"),
-                price=price,
-                currency=currency,
-                billing_interval=BillingInterval(billing_interval),
-                trial_period_days=trial_period_days,
-                status=status
-            )
+                price=spec.price,
+                currency=spec.currency,
+                billing_interval=BillingInterval(spec.billing_interval),
+                trial_period_days=spec.trial_period_days,
+                status=spec.status
+            ))
         else:
             db_plan.plan_code = paystack_plan.get("plan_code")
-        db.add(db_plan)
-        db.commit()
+    db.add_all(new_plans)
+    db.flush()
 
 if __name__ == '__main__':
     try:
-        db = next(get_db())
-        create_permissions(db=db)
-        create_subscription_plans(db=db)
-        create_default_admin_user(db=db)
+        with session_local() as db, db.begin():
+            create_permissions(db=db)
+            create_subscription_plans(db=db)
+            create_default_admin_user(db=db)
     except Exception as e:
         logger.error(e)
         raise e
\ No newline at end of file
@@ -1,51 +1,59 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from api import auth, projects, fields, files, receipts, data, subscriptions
-from config import settings, logger
-from utils import get_git_commit_hash, limiter, set_current_request
+from config import settings, logger, start_log_listener, stop_log_listener
+from utils import get_git_commit_hash, limiter, set_request_context
+
+COMMIT_HASH = get_git_commit_hash()
+API_V1 = settings.api_v1_str
+OPENAPI_URL = f"{API_V1}/openapi.json"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_log_listener()
+    yield
+    stop_log_listener()
 
 app = FastAPI(
     title=settings.project_name,
     version=settings.version,
-    openapi_url=f"{settings.api_v1_str}/openapi.json"
+    openapi_url=OPENAPI_URL,
+    dependencies=[Depends(set_request_context)],
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 app.state.limiter = limiter
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000","https://receiptiq.co"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.include_router(auth.router, prefix=settings.api_v1_str)
-app.include_router(projects.router, prefix=settings.api_v1_str)
-app.include_router(fields.router, prefix=settings.api_v1_str)
-app.include_router(receipts.router, prefix=settings.api_v1_str)
-app.include_router(data.router, prefix=settings.api_v1_str)
-app.include_router(subscriptions.router, prefix=settings.api_v1_str)
+app.include_router(auth.router, prefix=API_V1)
+app.include_router(projects.router, prefix=API_V1)
+app.include_router(fields.router, prefix=API_V1)
+app.include_router(receipts.router, prefix=API_V1)
+app.include_router(data.router, prefix=API_V1)
+app.include_router(subscriptions.router, prefix=API_V1)
 app.include_router(files.router, prefix="/files")
 
-@app.middleware("http")
-async def set_request_context(request: Request, call_next):
-    set_current_request(request)
-    response = await call_next(request)
-    return response
-
 @app.get(f"/")
 async def root(request: Request):
     """
     Root endpoint
     """
     logger.info(f"Accessing root of the app")
-    commit_hash = get_git_commit_hash()
     return {
         "message": "Welcome to ReceiptIQ API",
-        "root": settings.api_v1_str,
-        "commit": commit_hash,
-        "message": f"API v{settings.version} (commit: {commit_hash})",
+        "root": API_V1,
+        "commit": COMMIT_HASH,
+        "message": f"API v{settings.version} (commit: {COMMIT_HASH})",
         "docs": f"{request.base_url}docs"
     } 
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""store token hashes as bytea
+
+Revision ID: 8b2e4d6f1a93
+Revises: 3a7f1c2d9e40
+Create Date: 2025-10-28 10:40:37.205114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a93'
+down_revision: Union[str, None] = '3a7f1c2d9e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_TABLES = ('password_reset_tokens', 'refresh_tokens', 'revoked_tokens')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing values are sha256 hex digests; store the raw 32-byte digest instead
+    for table in TOKEN_TABLES:
+        op.alter_column(table, 'token_hash',
+                   existing_type=sa.String(length=500),
+                   type_=sa.LargeBinary(length=32),
+                   existing_nullable=False,
+                   postgresql_using="decode(token_hash, 'hex')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TOKEN_TABLES:
+        op.alter_column(table, 'token_hash',
+                   existing_type=sa.LargeBinary(length=32),
+                   type_=sa.String(length=500),
+                   existing_nullable=False,
+                   postgresql_using="encode(token_hash, 'hex')")
@@ -0,0 +1,48 @@
+"""server side timestamp defaults
+
+Revision ID: 5d9a2c7e4b16
+Revises: c41d7a9e2f08
+Create Date: 2025-10-29 09:10:22.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a2c7e4b16'
+down_revision: Union[str, None] = 'c41d7a9e2f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TIMESTAMP_COLUMNS = (
+    ('user_permissions', 'created_at'),
+    ('permissions', 'created_at'),
+    ('users', 'created_at'),
+    ('password_reset_tokens', 'created_at'),
+    ('refresh_tokens', 'created_at'),
+    ('revoked_tokens', 'revoked_at'),
+    ('login_attempts', 'attempted_at'),
+    ('audit_logs', 'timestamp'),
+    ('projects', 'created_at'),
+    ('fields', 'created_at'),
+    ('receipts', 'created_at'),
+    ('data_values', 'created_at'),
+    ('subscription_plans', 'created_at'),
+    ('payments', 'created_at'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name, server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name, server_default=None)
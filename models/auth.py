@@ -1,6 +1,6 @@
 import datetime
 import hashlib
-import random
+import hmac
 import secrets
 import string
 from typing import Any, Dict, List, Optional, Tuple
@@ -8,19 +8,23 @@ import uuid
 from fastapi import HTTPException
 import jwt
 import bcrypt
-from sqlalchemy import JSON, UUID, Boolean, Column, DateTime, ForeignKey, Integer, String, Table, func, select, true
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy import UUID, Boolean, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Table, event, func, select, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, Session, column_property, mapped_column, object_session, relationship
 
 from models import Model
+from models.subscriptions import Payment
 from config import logger, settings
 
+OTP_ALPHABET = string.ascii_uppercase + string.digits
+
 user_permissions_association = Table(
     'user_permissions',
     Model.metadata,
     Column('user_id', UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True),
     Column('permission_id', UUID(as_uuid=True), ForeignKey('permissions.id'), primary_key=True),
-    Column('created_at', DateTime, default=datetime.datetime.now),
-    Column('updated_at', DateTime, onupdate=datetime.datetime.now),
+    Column('created_at', DateTime, server_default=func.now()),
+    Column('updated_at', DateTime, onupdate=func.now()),
 )
 
 class Permission(Model):
@@ -29,8 +33,8 @@ class Permission(Model):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, unique=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(100))
     codename: Mapped[str] = mapped_column(String(100), unique=True)
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
     
     users: Mapped[List["User"]] = relationship(
         secondary=user_permissions_association, 
@@ -51,14 +55,19 @@ class User(Model):
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     accepted_terms: Mapped[bool] = mapped_column(Boolean, default=False, nullable=True)
     access_token: Mapped[Optional[str]] = mapped_column(String(500))
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
     locked_until: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), default=None)
     failed_login_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_subscription_end_at: Mapped[Optional[datetime.datetime]] = column_property(
+        select(func.max(Payment.subscription_end_at)).where(Payment.user_id == id).correlate_except(Payment).scalar_subquery(),
+        deferred=True
+    )
     
     scopes: Mapped[List[Permission]] = relationship(
         secondary=user_permissions_association,
-        back_populates='users'
+        back_populates='users',
+        lazy="selectin"
     )
     refresh_tokens: Mapped[List["RefreshToken"]] = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
     subscriptions: Mapped[List["Payment"]] = relationship("Payment", back_populates="user", cascade="all, delete-orphan") # type: ignore
@@ -82,7 +91,7 @@ class User(Model):
         """
         Create the verification code for the user and set it's expiry date and time
         """
-        self.otp = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(code_length))
+        self.otp = ''.join(secrets.choice(OTP_ALPHABET) for _ in range(code_length))
         self.otp_expiry_at = datetime.datetime.now() + datetime.timedelta(seconds=code_expiry_seconds)
         db.add(self)
         db.commit()
@@ -97,7 +106,7 @@ class User(Model):
         """
         time_now = datetime.datetime.now()
         logger.info(f"User {self.first_name} verification code {code} vs {self.otp} verification requested at {time_now} vs {self.otp_expiry_at}")
-        if self.otp == code and self.otp_expiry_at > time_now:
+        if self.otp and hmac.compare_digest(self.otp.encode('utf-8'), code.encode('utf-8')) and self.otp_expiry_at > time_now:
             self.is_verified = True
             self.is_active = True
             self.otp = None
@@ -113,7 +122,9 @@ class User(Model):
     
     def has_scope(self, required_scope: str) -> bool:
         """Check if user has required scope"""
-        user_scopes = [scope.codename for scope in self.scopes]
+        user_scopes = self.__dict__.get("_scope_codenames")
+        if user_scopes is None:
+            user_scopes = self._scope_codenames = frozenset(scope.codename for scope in self.scopes)
         return required_scope in user_scopes or "admin" in user_scopes
     
     @property
@@ -145,7 +156,7 @@ class User(Model):
     def create_refresh_token(self, db: Session) -> str:
         """Create a refresh token for a user"""
         token = secrets.token_urlsafe(settings.refresh_token_length)
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        token_hash = hashlib.sha256(token.encode()).digest()
         expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=settings.refresh_token_expiry_seconds)
         refresh_token = RefreshToken(user_id=self.id,token_hash=token_hash,expires_at=expires_at)
         db.add(refresh_token)
@@ -175,7 +186,7 @@ class User(Model):
     @staticmethod
     def verify_refresh_token(token: str, db: Session):
         """Verify refresh token and return user"""
-        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        token_hash = hashlib.sha256(token.encode()).digest()
         refresh_token = db.execute(select(RefreshToken).where(
             RefreshToken.token_hash == token_hash,
             RefreshToken.revoked == False,
@@ -189,44 +200,56 @@ class User(Model):
     def is_subscribed(self):
         """Check if user has any active subscriptions"""
         now = datetime.datetime.now(datetime.timezone.utc)
-        return any([sub.subscription_end_at > now for sub in self.subscriptions])
+        if "max_subscription_end_at" not in self.__dict__ and object_session(self) is None:
+            return any(sub.subscription_end_at > now for sub in self.subscriptions)
+        end_at = self.max_subscription_end_at
+        return end_at is not None and end_at > now
 
     def __str__(self):
         return f"{self.first_name} - {self.email}"
 
+@event.listens_for(User.scopes, "append")
+@event.listens_for(User.scopes, "remove")
+def _clear_scope_codenames(target: User, *args) -> None:
+    """Drop the cached scope codenames when the user's scopes change"""
+    target.__dict__.pop("_scope_codenames", None)
+
+event.listen(User, "expire", _clear_scope_codenames)
+event.listen(User, "refresh", _clear_scope_codenames)
+
 class PasswordResetToken(Model):
     __tablename__ = "password_reset_tokens"
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, unique=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
-    token_hash: Mapped[str] = mapped_column(String(500), nullable=False)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False, index=True)
     expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     used: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
 
 class RefreshToken(Model):
     __tablename__ = "refresh_tokens"
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, unique=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    token_hash: Mapped[str] = mapped_column(String(500), nullable=False)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False, index=True)
     expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
     revoked: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
 
     user: Mapped[User] = relationship("User", back_populates="refresh_tokens")
 
     def __str__(self):
-        return f"{self.user.first_name} - {self.token_hash}"
+        return f"{self.user.first_name} - {self.token_hash.hex()}"
 
 class RevokedToken(Model):
     __tablename__ = "revoked_tokens"
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, unique=True, default=uuid.uuid4)
-    token_hash: Mapped[str] = mapped_column(String(500), nullable=False)
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False, index=True)
     token_type: Mapped[str] = mapped_column(String, nullable=False)  # 'access' or 'refresh'
-    revoked_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, default=datetime.datetime.now)
+    revoked_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
     expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
 
 class LoginAttempt(Model):
@@ -236,7 +259,7 @@ class LoginAttempt(Model):
     email: Mapped[str] = mapped_column(String(100))
     ip_address: Mapped[str] = mapped_column(String, nullable=False)
     success: Mapped[bool] = mapped_column(Boolean, nullable=False)
-    attempted_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, default=datetime.datetime.now)
+    attempted_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
 
 class AuditLog(Model):
     __tablename__ = "audit_logs"
@@ -246,5 +269,9 @@ class AuditLog(Model):
     action: Mapped[str] = mapped_column(String, nullable=False)
     ip_address: Mapped[str] = mapped_column(String, nullable=False)
     user_agent: Mapped[str] = mapped_column(String, nullable=True)
-    details: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=True)
-    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
\ No newline at end of file
+    details: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=True)
+    timestamp: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_audit_logs_details_gin', 'details', postgresql_using='gin'),
+    )
\ No newline at end of file
@@ -1,14 +1,14 @@
 import uuid
 import datetime
-from typing import Optional
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from typing import Callable, Dict, Optional
+from sqlalchemy import DateTime, ForeignKey, Integer, SmallInteger, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 from sqlalchemy.dialects.postgresql import UUID
 from models import Model
-from typing import Dict, Optional, Any
-from sqlalchemy import DateTime, ForeignKey, JSON
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+
+# bounds of the SmallInteger coordinate columns
+COORDINATE_MIN = -32768
+COORDINATE_MAX = 32767
 
 
 class DataValue(Model):
@@ -19,23 +19,52 @@ class DataValue(Model):
     receipt_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("receipts.id"))
     value: Mapped[str] = mapped_column(String(300),nullable=False)
     row: Mapped[int] = mapped_column(Integer,default=0, nullable=True)
-    x: Mapped[int] = mapped_column(Integer,default=0)
-    y: Mapped[int] = mapped_column(Integer,default=0)
-    width: Mapped[int] = mapped_column(Integer,default=0)
-    height: Mapped[int] = mapped_column(Integer,default=0)
-    value: Mapped[str] = mapped_column(String(300),nullable=False)
+    x: Mapped[int] = mapped_column(SmallInteger,default=0)
+    y: Mapped[int] = mapped_column(SmallInteger,default=0)
+    width: Mapped[int] = mapped_column(SmallInteger,default=0)
+    height: Mapped[int] = mapped_column(SmallInteger,default=0)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
 
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    __table_args__ = (
+        UniqueConstraint('receipt_id', 'field_id', 'row', name='uq_dv_receipt_field_row'),
+    )
 
     field: Mapped["Field"] = relationship("Field", back_populates="data_values") # type: ignore
     receipt: Mapped["Receipt"] = relationship("Receipt", back_populates="data_values") # type: ignore
 
+    @staticmethod
+    def clamp_coordinate(value) -> Optional[int]:
+        """
+        Round an extracted coordinate into the SmallInteger range, or None when it is missing or not a number
+        """
+        if value is None:
+            return None
+        try:
+            coordinate = round(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return max(COORDINATE_MIN, min(COORDINATE_MAX, coordinate))
+
     @property
     def fully_name(self):
-        name = self.field.name
-        parent = self.field.parent
+        return self._join_name(self.field, lambda field: field.parent)
+
+    def fully_name_in(self, fields: Dict[uuid.UUID, "Field"]) -> str: # type: ignore
+        """
+        fully_name resolved through a map of the project's fields by id, without touching the relationships
+        """
+        return self._join_name(fields[self.field_id], lambda field: fields.get(field.parent_id))
+
+    def _join_name(self, field, parent_of: Callable) -> str:
+        names = [field.name]
+        arrays = 0
+        parent = parent_of(field)
         while parent:
-            name = f"{parent.name}_{name}" if parent.type != "array" else f"{parent.name}_{name}_{self.row}"
-            parent = parent.parent
-        return name
\ No newline at end of file
+            names.append(parent.name)
+            arrays += parent.type == "array"
+            parent = parent_of(parent)
+        names.reverse()
+        names.extend([str(self.row)] * arrays)
+        return "_".join(names)
\ No newline at end of file
@@ -1,15 +1,14 @@
 import uuid
 import datetime
+from enum import Enum as PyEnum
 from typing import List, Optional
-from sqlalchemy import String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import String, DateTime, ForeignKey, Enum, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 from sqlalchemy.dialects.postgresql import UUID
 from models import Model
-from typing import Optional, List
-from sqlalchemy import String, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
-from enum import Enum as PyEnum
+
+# how many levels of nested children are eagerly loaded with a field
+MAX_FIELD_DEPTH = 8
 
 class FieldType(str, PyEnum):
     STRING = 'string'
@@ -28,8 +27,8 @@ class Field(Model):
     description: Mapped[Optional[str]] = mapped_column(String(500))
     project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id"))
     parent_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("fields.id"))
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
 
     __table_args__ = (
         UniqueConstraint('name', 'project_id', name='uq_field_name_project'),
@@ -1,18 +1,14 @@
 import uuid
 import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import HTTPException
-from sqlalchemy import String, DateTime, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column,relationship,Session
-from sqlalchemy.dialects.postgresql import UUID
-from typing import Dict, Optional, List
-from sqlalchemy import String, DateTime, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
+from sqlalchemy import String, DateTime, ForeignKey, func, select
+from sqlalchemy.orm import Mapped, column_property, mapped_column,relationship,selectinload,Session
 from sqlalchemy.dialects.postgresql import UUID
 
 from models import Model
 from .auth import User
-from .fields import Field, FieldType
+from .fields import MAX_FIELD_DEPTH, Field, FieldType
 from .receipts import Receipt
 
 class Project(Model):
@@ -22,12 +18,16 @@ class Project(Model):
     name: Mapped[str] = mapped_column(String(100))
     description: Mapped[Optional[str]] = mapped_column(String(500))
     owner_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
     
     owner: Mapped[User] = relationship("User")
     fields: Mapped[List[Field]] = relationship("Field", back_populates="project", cascade="all, delete-orphan")
     receipts: Mapped[List[Receipt]] = relationship("Receipt", back_populates="project", cascade="all, delete-orphan")
+    receipts_count: Mapped[int] = column_property(
+        select(func.count(Receipt.id)).where(Receipt.project_id == id).correlate_except(Receipt).scalar_subquery(),
+        deferred=True
+    )
 
     def add_field(self, db: Session, name: str, type: FieldType, description: str = None, parent_id: UUID = None) -> Field:
         """
@@ -49,7 +49,7 @@ class Project(Model):
         """
         Get a field by its ID
         """
-        field = db.query(Field).filter(Field.id == field_id, Field.project_id == self.id).first()
+        field = db.query(Field).filter(Field.id == field_id, Field.project_id == self.id).options(selectinload(Field.children, recursion_depth=MAX_FIELD_DEPTH)).first()
         if not field:
             raise HTTPException(status_code=404, detail={"message": f"Field with id {field_id} not found in project {self.name}"})
         return field
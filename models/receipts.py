@@ -1,14 +1,10 @@
 import os
 import uuid
 import datetime
-from typing import List, Optional
-from sqlalchemy import String, DateTime, ForeignKey, select
-from sqlalchemy.orm import Mapped, mapped_column,relationship,Session
-from sqlalchemy.dialects.postgresql import UUID
-from typing import Dict, Optional, Any, List
-from sqlalchemy import String, DateTime, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
-from sqlalchemy.dialects.postgresql import UUID
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import String, DateTime, ForeignKey, func, select
+from sqlalchemy.orm import Mapped, mapped_column,relationship,selectinload,Session
+from sqlalchemy.dialects.postgresql import UUID, insert
 
 from utils import InvoiceExtractor, StorageService
 from models import Model
@@ -19,49 +15,86 @@ class Receipt(Model):
     __tablename__ = "receipts"
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, unique=True, default=uuid.uuid4)
-    project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id"))
+    project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id"), index=True)
     file_path: Mapped[str] = mapped_column(String(500))
     file_name: Mapped[str] = mapped_column(String(255))
     mime_type: Mapped[str] = mapped_column(String(100))
     status: Mapped[str] = mapped_column(String(50), default='pending')
     error_message: Mapped[Optional[str]] = mapped_column(String(500))
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.now)
-    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=datetime.datetime.now)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, onupdate=func.now())
     
     project: Mapped["Project"] = relationship("Project", back_populates="receipts") # type: ignore
     data_values: Mapped[List[DataValue]] = relationship("DataValue", back_populates="receipt", cascade="all, delete-orphan")
 
-    def add_data(self, db: Session, result: Dict = None, row_id: int = 0):
+    @staticmethod
+    def _walk(result: Dict, fields: Dict[str, Field]) -> Iterator[Tuple[Field, int, Dict]]:
         """
-        Add a new data value to the receipt
+        Yield (field, row_id, value) for every leaf of an extraction result, depth first
         """
-        for field_name, value in result.items():
-            field: Field = db.execute(select(Field).where(Field.project_id == self.project_id, Field.name == field_name)).scalar_one_or_none()
+        stack = [(iter(result.items()), 0)]
+        while stack:
+            items, row_id = stack[-1]
+            entry = next(items, None)
+            if entry is None:
+                stack.pop()
+                continue
+            field_name, value = entry
+            field: Field = fields.get(field_name)
             if field and len(field.children) == 0:
-                data_value = db.execute(select(DataValue).where(DataValue.field_id == field.id, DataValue.receipt_id == self.id, DataValue.row == row_id)).scalar_one_or_none()
-                if not data_value:
-                    data_value = DataValue()
-                data_value.field=field
-                data_value.receipt=self
-                if value and value.get("value"):
-                    data_value.value=value["value"]
-                else:
-                    data_value.value=""
-                data_value.row=row_id
-                if value.get("coordinates"):
-                    data_value.x=value.get("coordinates",{}).get("x",0)
-                    data_value.y=value.get("coordinates",{}).get("y",0)
-                    data_value.width=value.get("coordinates",{}).get("width",0)
-                    data_value.height=value.get("coordinates",{}).get("height",0)
-                db.add(data_value)
-                db.commit()
-                db.refresh(data_value)
+                yield field, row_id, value
+            elif isinstance(value, list):
+                # push rows last-to-first so row 1 is walked first
+                stack.extend((iter(item.items()), id) for id, item in reversed(list(enumerate(value, start=1))))
             else:
-                if isinstance(value, list):
-                    for id,item in enumerate(value, start=1):
-                        self.add_data(db, item, row_id=id)
-                else:
-                    self.add_data(db, value)
+                stack.append((iter(value.items()), 0))
+
+    def add_data(self, db: Session, result: Dict = None):
+        """
+        Upsert the extracted data values of the receipt
+        """
+        fields = {
+            field.name: field
+            for field in db.execute(select(Field).where(Field.project_id == self.project_id).options(selectinload(Field.children))).scalars()
+        }
+        # keyed by (field_id, row) so a repeated leaf doesn't hit the same row twice in one statement
+        values = {}
+        for field, row_id, value in self._walk(result, fields):
+            coordinates = value.get("coordinates") or {}
+            box = {name: DataValue.clamp_coordinate(coordinates.get(name)) for name in ("x", "y", "width", "height")}
+            # a box with a missing or non-numeric side is no position at all: new rows get the
+            # columns' 0 default and existing rows keep the coordinates they already have
+            has_coordinates = None not in box.values()
+            values[(field.id, row_id)] = (has_coordinates, {
+                "field_id": field.id,
+                "receipt_id": self.id,
+                "value": value["value"] if value and value.get("value") else "",
+                "row": row_id,
+                **(box if has_coordinates else dict.fromkeys(box, 0)),
+            })
+        with_coordinates = [params for has_coordinates, params in values.values() if has_coordinates]
+        without_coordinates = [params for has_coordinates, params in values.values() if not has_coordinates]
+        stmt = insert(DataValue)
+        if with_coordinates:
+            db.execute(stmt.on_conflict_do_update(
+                constraint="uq_dv_receipt_field_row",
+                set_={
+                    "value": stmt.excluded.value,
+                    "x": stmt.excluded.x,
+                    "y": stmt.excluded.y,
+                    "width": stmt.excluded.width,
+                    "height": stmt.excluded.height,
+                    "updated_at": func.now(),
+                },
+            ), with_coordinates)
+        if without_coordinates:
+            # existing coordinates are kept when the extractor didn't return any
+            db.execute(stmt.on_conflict_do_update(
+                constraint="uq_dv_receipt_field_row",
+                set_={"value": stmt.excluded.value, "updated_at": func.now()},
+            ), without_coordinates)
+        if values:
+            db.expire(self, ["data_values"])
         
     def process(self, db: Session, extractor: InvoiceExtractor, fields: List[Dict[str, Any]]) -> List[DataValue]:
         """
@@ -80,19 +113,18 @@ class Receipt(Model):
             self.add_data(db, result)               
             self.status = "completed"
             db.add(self)
-            db.commit()
-            db.refresh(self)
+            db.flush()
             # add empty values for non list/array field not found in result
+            existing_field_ids = {d.field_id for d in self.data_values}
             for field in self.project.fields:
-                if field not in [d.field for d in self.data_values] and field.type not in ["array","object"]:
+                if field.id not in existing_field_ids and field.type not in ["array","object"]:
                     data_value = DataValue()
                     data_value.field = field
                     data_value.receipt = self
                     data_value.value = ""
                     data_value.row = 0
                     db.add(data_value)
-                    db.commit()
-            db.refresh(self)
+            db.commit()
             return self.data_values
         
         except Exception as e:
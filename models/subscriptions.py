@@ -1,18 +1,38 @@
-from ast import Dict
 import decimal
+import sys
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
-from sqlalchemy import BigInteger, String, DateTime, ForeignKey, Float, Text, Integer
+from enum import Enum as PyEnum
+from typing import Dict, List, Optional
+from sqlalchemy import BigInteger, String, DateTime, ForeignKey, Index, Numeric, Text, Integer, Enum, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column,relationship
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from config import subscription_plans
 from models import Model
-from typing import Optional, List
-from sqlalchemy import String, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
-from enum import Enum as PyEnum
+
+# datetime.fromisoformat only accepts the trailing 'Z' Paystack sends from Python 3.11
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Paystack ISO 8601 timestamp, returning None for missing values"""
+    if not value:
+        return None
+    if _FROMISOFORMAT_ACCEPTS_Z:
+        return datetime.fromisoformat(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _to_decimal(value) -> decimal.Decimal:
+    """Convert a Paystack amount to Decimal, skipping the str round-trip for integers"""
+    if isinstance(value, int):
+        return decimal.Decimal(value)
+    return decimal.Decimal(str(value))
+
+def _kobo_to_decimal(value) -> Optional[decimal.Decimal]:
+    """Convert an amount in the lowest currency unit (kobo/cents) to Decimal, None when missing"""
+    if not value:
+        return None
+    return _to_decimal(value) / 100
 
 class CurrencyType(str, PyEnum):
     EUR = 'EUR'
@@ -40,6 +60,10 @@ class PaymentStatus(PyEnum):
     ABANDONED = "abandoned"
     REVERSED = "reversed"
 
+class PaymentDomain(PyEnum):
+    TEST = "test"
+    LIVE = "live"
+
 class PaymentChannel(PyEnum):
     CARD = "card"
     BANK_TRANSFER = "bank_transfer"
@@ -48,6 +72,14 @@ class PaymentChannel(PyEnum):
     MOBILE_MONEY = "mobile_money"
     BANK = "bank"
 
+_BILLING_DAYS = {
+    BillingInterval.DAILY: 1,
+    BillingInterval.WEEKLY: 7,
+    BillingInterval.MONTHLY: 30,
+    BillingInterval.QUARTERLY: 90,
+    BillingInterval.ANNUALLY: 366,
+}
+
 class SubscriptionPlan(Model):
     __tablename__ = "subscription_plans"
 
@@ -57,29 +89,19 @@ class SubscriptionPlan(Model):
     benefits: Mapped[Optional[str]] = mapped_column(Text)
     invoice_limits: Mapped[int] = mapped_column(Integer,default=0)
     plan_code: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    price: Mapped[decimal.Decimal] = mapped_column(Float(precision=10, decimal_return_scale=2), nullable=False)
+    price: Mapped[decimal.Decimal] = mapped_column(Numeric(precision=10, scale=2), nullable=False)
     currency: Mapped[str] = mapped_column(Enum(CurrencyType), default=CurrencyType.USD)  # ISO 4217 currency code
     billing_interval: Mapped[BillingInterval] = mapped_column(Enum(BillingInterval), default=BillingInterval.MONTHLY)
     trial_period_days: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     status: Mapped[PlanStatus] = mapped_column(Enum(PlanStatus), default=PlanStatus.ACTIVE)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=func.now())
 
     payments: Mapped["Payment"] = relationship("Payment", back_populates="plan") # type: ignore
 
     @property
     def days(self):
-        match self.billing_interval:
-            case BillingInterval.DAILY:
-                return 1
-            case BillingInterval.WEEKLY:
-                return 7
-            case BillingInterval.MONTHLY:
-                return 30
-            case BillingInterval.QUARTERLY:
-                return 90
-            case BillingInterval.ANNUALLY:
-                return 366
+        return _BILLING_DAYS.get(self.billing_interval)
 
     def __repr__(self):
         return f"<SubscriptionPlan(id={self.id}, name='{self.name}', price={self.price})>"
@@ -91,12 +113,12 @@ class Payment(Model):
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     subscription_code: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     subscription_plan_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("subscription_plans.id"))
-    transaction_id: Mapped[Optional[int]] = mapped_column(BigInteger)  # Paystack ID (4099260516)
-    domain: Mapped[Optional[str]] = mapped_column(String(50))  # test/live
-    status: Mapped[PaymentStatus] = mapped_column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    transaction_id: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Paystack ID (4099260516)
+    domain: Mapped[Optional[PaymentDomain]] = mapped_column(Enum(PaymentDomain))
+    status: Mapped[PaymentStatus] = mapped_column(Enum(PaymentStatus), default=PaymentStatus.PENDING, index=True)
     reference: Mapped[Optional[str]] = mapped_column(String(255))  # Paystack reference
     receipt_number: Mapped[Optional[str]] = mapped_column(String(255))
-    amount: Mapped[decimal.Decimal] = mapped_column(Float(precision=15, decimal_return_scale=2), nullable=False)  # Amount paid
+    amount: Mapped[decimal.Decimal] = mapped_column(Numeric(precision=15, scale=2), nullable=False)  # Amount paid
     message: Mapped[Optional[str]] = mapped_column(Text)
     gateway_response: Mapped[Optional[str]] = mapped_column(String(255))
     paid_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -106,24 +128,31 @@ class Payment(Model):
     channel: Mapped[Optional[PaymentChannel]] = mapped_column(Enum(PaymentChannel), default=PaymentChannel.CARD)
     currency: Mapped[CurrencyType] = mapped_column(Enum(CurrencyType), default=CurrencyType.USD)
     ip_address: Mapped[Optional[str]] = mapped_column(String(45))  # Support IPv6
-    payment_metadata: Mapped[Optional[str]] = mapped_column(JSONB)  # Custom metadata
-    log: Mapped[Optional[str]] = mapped_column(JSONB)  # Payment log/history
-    fees: Mapped[Optional[decimal.Decimal]] = mapped_column(Float(precision=15, decimal_return_scale=2))
-    fees_split: Mapped[Optional[str]] = mapped_column(JSONB)  # JSON data for fee breakdown
+    payment_metadata: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Custom metadata
+    log: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Payment log/history
+    fees: Mapped[Optional[decimal.Decimal]] = mapped_column(Numeric(precision=15, scale=2))
+    fees_split: Mapped[Optional[Dict]] = mapped_column(JSONB)  # JSON data for fee breakdown
     authorization: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Full authorization object
-    customer: Mapped[Optional[str]] = mapped_column(JSONB)  # Full customer object
-    plan_object: Mapped[Optional[str]] = mapped_column(JSONB)  # Plan details if applicable
-    split: Mapped[Optional[str]] = mapped_column(JSONB)  # Split payment details
+    customer: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Full customer object
+    plan_object: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Plan details if applicable
+    split: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Split payment details
     order_id: Mapped[Optional[str]] = mapped_column(String(255))
-    requested_amount: Mapped[Optional[decimal.Decimal]] = mapped_column(Float(precision=15, decimal_return_scale=2))  # Original amount
-    pos_transaction_data: Mapped[Optional[str]] = mapped_column(JSONB)  # POS specific data
-    source: Mapped[Optional[str]] = mapped_column(JSONB)  # Payment source details
-    fees_breakdown: Mapped[Optional[str]] = mapped_column(JSONB)  # JSON data
-    connect: Mapped[Optional[str]] = mapped_column(JSONB)  # Connect details
+    requested_amount: Mapped[Optional[decimal.Decimal]] = mapped_column(Numeric(precision=15, scale=2))  # Original amount
+    pos_transaction_data: Mapped[Optional[Dict]] = mapped_column(JSONB)  # POS specific data
+    source: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Payment source details
+    fees_breakdown: Mapped[Optional[Dict]] = mapped_column(JSONB)  # JSON data
+    connect: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Connect details
     transaction_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
-    subaccount: Mapped[Optional[str]] = mapped_column(JSONB)  # Subaccount details
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=datetime.now)
+    subaccount: Mapped[Optional[Dict]] = mapped_column(JSONB)  # Subaccount details
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, onupdate=func.now())
+
+    __table_args__ = (
+        Index('ix_payments_user_end', 'user_id', 'subscription_end_at'),
+        Index('ix_payments_user_status', 'user_id', 'status'),
+        Index('ix_payments_metadata_gin', 'payment_metadata', postgresql_using='gin'),
+        Index('ix_payments_authorization_gin', 'authorization', postgresql_using='gin'),
+    )
     
     user = relationship("User", back_populates="subscriptions")
     plan: Mapped["SubscriptionPlan"] = relationship("SubscriptionPlan", back_populates="payments")
@@ -143,8 +172,10 @@ class Payment(Model):
     @property
     def masked_card_number(self) -> Optional[str]:
         """Return masked card number if available"""
-        if self.authorization["bin"] and self.authorization["last4"]:
-            return f"{self.authorization['bin']}****{self.authorization['last4']}"
+        auth = self.authorization or {}
+        card_bin, last4 = auth.get("bin"), auth.get("last4")
+        if card_bin and last4:
+            return f"{card_bin}****{last4}"
         return None
     
     @classmethod
@@ -153,51 +184,55 @@ class Payment(Model):
 
         auth = data.get('authorization', {})
         customer = data.get('customer', {})
+        channel = data.get('channel')
+        currency = data.get('currency')
         
         return cls(
             user_id=user_id,
             subscription_code = data.get("subscription_code"),
             subscription_plan_id = data.get("subscription_plan_id"),
             transaction_id=data.get('id'),
-            domain=data.get('domain'),
-            status=PaymentStatus(data.get('status', 'pending')),
+            domain=PaymentDomain._value2member_map_.get(data.get('domain')),
+            status=PaymentStatus._value2member_map_[data.get('status', 'pending')],
             reference=data.get('reference'),
             receipt_number=data.get('receipt_number'),
-            amount=decimal.Decimal(str(data.get('amount', 0))),  # Convert from kobo to naira
+            amount=_to_decimal(data.get('amount', 0)),
             message=data.get('message'),
             gateway_response=data.get('gateway_response'),
-            paid_at=datetime.fromisoformat(data.get('paid_at').replace('Z', '+00:00')) if data.get('paid_at') else None,
+            paid_at=_parse_dt(data.get('paid_at')),
             subscription_start_at = data.get("subscription_start_at"),
             subscription_end_at = data.get("subscription_end_at"),
-            created_at=datetime.fromisoformat(data.get('created_at').replace('Z', '+00:00')) if data.get('created_at') else None,
-            channel=PaymentChannel(data.get('channel')) if data.get('channel') else None,
-            currency=CurrencyType(data.get('currency', 'USD')),
+            created_at=_parse_dt(data.get('created_at')),
+            channel=PaymentChannel._value2member_map_[channel] if channel else None,
+            currency=CurrencyType._value2member_map_[currency] if currency else CurrencyType.USD,
             ip_address=data.get('ip_address'),
             payment_metadata=data.get('metadata'),
             log=data.get('log'),
-            fees=decimal.Decimal(str(data.get('fees', 0))) / 100 if data.get('fees') else None,
+            fees=_kobo_to_decimal(data.get('fees')),
             fees_split=data.get('fees_split'),
             authorization=auth,
             customer=customer,
             plan_object=data.get('plan_object'),
             split=data.get('split'),
             order_id=data.get('order_id'),
-            requested_amount=decimal.Decimal(str(data.get('requested_amount', 0))) / 100 if data.get('requested_amount') else None,
+            requested_amount=_kobo_to_decimal(data.get('requested_amount')),
             pos_transaction_data=data.get('pos_transaction_data'),
             source=data.get('source'),
             fees_breakdown=data.get('fees_breakdown'),
             connect=data.get('connect'),
-            transaction_date=datetime.fromisoformat(data.get('transaction_date').replace('Z', '+00:00')) if data.get('transaction_date') else None,
+            transaction_date=_parse_dt(data.get('transaction_date')),
             subaccount=data.get('subaccount'),
         )
     
     def __repr__(self):
         return f"<Payment(id={self.id}, reference='{self.reference}', amount={self.amount}, status='{self.status}')>"
 
-    @property
+    @hybrid_property
     def is_active(self):
-        if self.subscription_end_at.tzinfo is None:
-            end_at_aware = self.subscription_end_at.replace(tzinfo=timezone.utc)
-        else:
-            end_at_aware = self.subscription_end_at
-        return datetime.now(timezone.utc) < end_at_aware
\ No newline at end of file
+        # subscription_end_at is a timestamptz column and always set tz-aware
+        return datetime.now(timezone.utc) < self.subscription_end_at
+
+    @is_active.inplace.expression
+    @classmethod
+    def _is_active_expression(cls):
+        return cls.subscription_end_at > func.now()
\ No newline at end of file
@@ -2,5 +2,6 @@ from .commons import *
 from .auth import *
 from .projects import *
 from .fields import *
+from .data import *
 from .receipts import *
 from .subscriptions import *
\ No newline at end of file
@@ -4,6 +4,8 @@ from uuid import UUID
 from fastapi import Form
 from pydantic import BaseModel, EmailStr, Field, ConfigDict, constr
 
+_TRUTHY = frozenset({"true", "on", "1"})
+
 class LoginRequest(BaseModel):
     username: EmailStr = Field(..., json_schema_extra="user@example.com", description="User's email address")
     password: str = Field(..., json_schema_extra="supersecret", description="User's password")
@@ -13,7 +15,7 @@ class LoginRequest(BaseModel):
 
     @property
     def is_remember_me(self):
-        return self.remember_me.lower() in ["true","on","1"]
+        return self.remember_me.lower() in _TRUTHY
 
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr = Field(..., json_schema_extra="user@example.com", description="User's email address")
@@ -53,7 +55,7 @@ class PermissionResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -77,7 +79,7 @@ class UserSubscription(BaseModel):
     subscription_start_at: datetime
     subscription_end_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class UserResponse(UserBase):
     id: UUID
@@ -89,7 +91,7 @@ class UserResponse(UserBase):
     is_subscribed: bool
     subscriptions: List[UserSubscription] = []
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class UserWithToken(UserResponse):
     access_token: str
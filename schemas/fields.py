@@ -24,13 +24,13 @@ class FieldParent(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     type: FieldType
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class FieldProject(BaseModel):
     id: UUID
     name: str = Field(..., min_length=1, max_length=100)
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class FieldResponse(BaseModel):
     id: UUID
@@ -43,4 +43,4 @@ class FieldResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True)
\ No newline at end of file
@@ -1,11 +1,9 @@
 from uuid import UUID
 from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr, Field, ConfigDict, computed_field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 from schemas.fields import FieldResponse
-from schemas.data import DataValueResponse
-from utils.helpers import get_current_request
 
 class ProjectBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -24,39 +22,14 @@ class ProjectOwner(BaseModel):
     first_name: str
     last_name: str
 
-    model_config = ConfigDict(from_attributes=True)
-
-class ProjectReceipt(BaseModel):
-    id: UUID
-    data_values: List[DataValueResponse]
-    file_path: str
-    file_name: str
-    mime_type: str
-    status: str
-    created_at: datetime
-
-    @computed_field
-    @property
-    def download_url(self) -> str:
-        """Compute the download URL from the current request context"""
-        request = get_current_request()
-        if request:
-            if "api.receiptiq.co" in str(request.base_url):
-                base_url = str(request.base_url).replace("http","https")
-            else:
-                base_url = request.base_url
-            return f"{base_url}files/{self.file_path}"
-        filename = self.file_path.split('/')[-1] if '/' in self.file_path else self.file_path
-        return f"/files/{filename}"
-
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class ProjectResponse(ProjectBase):
     id: UUID
-    receipts: List[ProjectReceipt]
+    receipts_count: int
     fields: List[FieldResponse]
     owner: ProjectOwner
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True)
\ No newline at end of file
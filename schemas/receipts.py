@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 
-from utils.helpers import get_current_request
+from utils.helpers import get_files_base_url
 
 class ReceiptCreate(BaseModel):
     file_name: str = Field(..., min_length=1, max_length=255)
@@ -17,7 +17,7 @@ class ReceiptField(BaseModel):
     id: UUID
     name: str
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class ReceiptData(BaseModel):
     id: UUID
@@ -29,7 +29,7 @@ class ReceiptData(BaseModel):
     field: ReceiptField
     row: Optional[int] = 0
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class ReceiptResponse(BaseModel):
     id: UUID
@@ -46,14 +46,10 @@ class ReceiptResponse(BaseModel):
     @property
     def download_url(self) -> str:
         """Compute the download URL from the current request context"""
-        request = get_current_request()
-        if request:
-            if "api.receiptiq.co" in str(request.base_url):
-                base_url = str(request.base_url).replace("http","https")
-            else:
-                base_url = request.base_url
-            return f"{base_url}files/{self.file_path}"
+        base_url = get_files_base_url()
+        if base_url:
+            return f"{base_url}{self.file_path}"
         filename = self.file_path.split('/')[-1] if '/' in self.file_path else self.file_path
         return f"/files/{filename}"
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True)
\ No newline at end of file
@@ -33,7 +33,7 @@ class SubscriptionPlanResponse(BaseModel):
     updated_at: Optional[datetime] = None
     
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class StartPaymentPayload(BaseModel):
     plan_id: UUID
@@ -51,4 +51,4 @@ class PaymentResponse(BaseModel):
     updated_at: Optional[datetime] = None
     
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True)
\ No newline at end of file
@@ -1,74 +1,272 @@
+import base64
 import os
+import uuid
+from functools import partial
+from datetime import datetime, timedelta, timezone
+import bcrypt
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from moto import mock_aws
 import pytest
+import pytest_asyncio
 from pytest_postgresql import factories
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from config import Settings, get_settings
+from sqlalchemy import create_engine, event, insert, select, text
+from sqlalchemy.orm import Session
+from config import get_settings
 from initialize_db import create_permissions
 import models
+from models import Payment, Permission, Project, SubscriptionPlan, User, user_permissions_association
 from main import app
 from utils import get_db
 
 postgresql_proc = factories.postgresql_proc()
 
-@pytest.fixture(scope="function")
-def test_settings(monkeypatch, postgresql_proc):
-    monkeypatch.setenv("POSTGRES_USER", postgresql_proc.user)
-    monkeypatch.setenv("POSTGRES_PASSWORD", "")
-    monkeypatch.setenv("POSTGRES_DB", postgresql_proc.dbname)
-    monkeypatch.setenv("POSTGRES_HOST", postgresql_proc.host)
-    monkeypatch.setenv("POSTGRES_PORT", str(postgresql_proc.port))
-    
-    monkeypatch.setenv("CLIENT_ID", "test-client-id")
-    monkeypatch.setenv("CLIENT_SECRET", "test-client-secret")
-    
-    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "")
-    monkeypatch.setenv("AWS_ENDPOINT_URL_S3", "")
-    monkeypatch.setenv("AWS_REGION", "")
-    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "")
-    monkeypatch.setenv("BUCKET_NAME", "test-bucket")
-    monkeypatch.setenv("GOOGLE_CLIENT_ID", "test-google-client-id")
-    monkeypatch.setenv("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
-    monkeypatch.setenv("GOOGLE_REDIRECT_URI", "test.google.redirect.callback.url")
-
-    
-    return Settings()
+SEED_USER = {
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "email": "seeded.user@receiptiq.co",
+    "password": "SuperS3cr3t@Pass"
+}
 
-@pytest.fixture(scope="function")
-def db(test_settings):
-    """Create test database engine"""
+GRANTED_SCOPES = (
+    "write:projects",
+    "read:projects",
+    "delete:projects",
+    "read:fields",
+    "write:fields",
+    "delete:fields",
+    "read:receipts",
+    "write:receipts",
+    "process:projects",
+    "read:data",
+    "write:data",
+    "export:data",
+)
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing():
+    """Hash test passwords at bcrypt's minimum cost; hashes stay real, so verify_password still checks them"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(bcrypt, "gensalt", partial(bcrypt.gensalt, rounds=4))
+        yield
+
+@pytest.fixture(scope="session")
+def test_settings(postgresql_proc):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("POSTGRES_USER", postgresql_proc.user)
+        monkeypatch.setenv("POSTGRES_PASSWORD", "")
+        monkeypatch.setenv("POSTGRES_DB", postgresql_proc.dbname)
+        monkeypatch.setenv("POSTGRES_HOST", postgresql_proc.host)
+        monkeypatch.setenv("POSTGRES_PORT", str(postgresql_proc.port))
+        
+        monkeypatch.setenv("CLIENT_ID", "test-client-id")
+        monkeypatch.setenv("CLIENT_SECRET", "test-client-secret")
+        
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "")
+        monkeypatch.setenv("AWS_ENDPOINT_URL_S3", "")
+        monkeypatch.setenv("AWS_REGION", "")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "")
+        monkeypatch.setenv("BUCKET_NAME", "test-bucket")
+        monkeypatch.setenv("GOOGLE_CLIENT_ID", "test-google-client-id")
+        monkeypatch.setenv("GOOGLE_CLIENT_SECRET", "test-google-client-secret")
+        monkeypatch.setenv("GOOGLE_REDIRECT_URI", "test.google.redirect.callback.url")
+
+        # get_settings is cached; drop the instance built from the real environment
+        # and share the rebuilt one with anything resolving get_settings()
+        get_settings.cache_clear()
+        yield get_settings()
+    get_settings.cache_clear()
+
+@pytest.fixture(scope="session")
+def client_auth_headers(test_settings) -> dict[str, str]:
+    """HTTP Basic header carrying the OAuth client credentials the auth endpoints expect"""
+    credentials = base64.b64encode(f"{test_settings.client_id}:{test_settings.client_secret}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+@pytest.fixture(scope="session")
+def engine(test_settings):
+    """Create the test database and schema once for the whole run"""
     url_san_db = f'postgresql://{test_settings.postgres_user}:@{test_settings.postgres_host}:{test_settings.postgres_port}'
-    engine = create_engine(url_san_db, isolation_level="AUTOCOMMIT", pool_pre_ping=True)
-    with engine.connect() as conn:
+    admin_engine = create_engine(url_san_db, isolation_level="AUTOCOMMIT", pool_pre_ping=True)
+    with admin_engine.connect() as conn:
         conn.execute(text(f"DROP DATABASE IF EXISTS {test_settings.postgres_db};"))
         conn.execute(text(f"CREATE DATABASE {test_settings.postgres_db};"))
-    engine.dispose()
     engine = create_engine(test_settings.database_url, pool_pre_ping=True)
     models.Model.metadata.create_all(bind=engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
-    
-    create_permissions(session)
-        
-    yield session
-    
-    session.rollback()
-    session.close()
+    with Session(bind=engine) as session:
+        create_permissions(session)
+        session.commit()
+
+    yield engine
+
     models.Model.metadata.drop_all(bind=engine)
     engine.dispose()
-    
-    cleanup_engine = create_engine(url_san_db, isolation_level="AUTOCOMMIT", pool_pre_ping=True)
-    with cleanup_engine.connect() as conn:
+    with admin_engine.connect() as conn:
         conn.execute(text(f"DROP DATABASE IF EXISTS {test_settings.postgres_db};"))
-    cleanup_engine.dispose()
+    admin_engine.dispose()
+
+@pytest.fixture(scope="function")
+def db(engine):
+    """Session inside a transaction that is rolled back after each test; commits only release savepoints"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+
+    yield session
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture(scope="session", autouse=True)
+def _aws():
+    """moto's in-memory AWS backends, started once and kept for the rest of the run"""
+    with mock_aws():
+        yield
+
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient (and its portal thread) shared by the whole run"""
+    with TestClient(app) as test_client:
+        yield test_client
 
 @pytest.fixture
-def client(db):
+def db_override(db):
+    """Route the app's get_db dependency to the test's session"""
     def override_get_db():
         yield db
-    
+
     app.dependency_overrides[get_db] = override_get_db
-    yield TestClient(app)
-    
-    app.dependency_overrides.clear()
\ No newline at end of file
+    yield db
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def client(app_client, db_override):
+    app_client.cookies.clear()
+    yield app_client
+
+@pytest_asyncio.fixture
+async def aclient(db_override):
+    """Calls the app in-process on the test's event loop, without TestClient's portal thread"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver", follow_redirects=True) as async_client:
+        yield async_client
+
+@pytest.fixture
+def executed_statements(engine):
+    """Collect every SQL statement sent through the test engine"""
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture(scope="session")
+def pro_plan(engine) -> uuid.UUID:
+    """The Pro subscription plan, committed once per run"""
+    with Session(bind=engine, expire_on_commit=False) as session:
+        plan = SubscriptionPlan(
+            name="Pro",
+            description="Pro",
+            benefits="benefit1$benefit2",
+            plan_code="pro-code",
+            price=1000,
+            currency="KES",
+            invoice_limits=1000
+        )
+        session.add(plan)
+        session.commit()
+        return plan.id
+
+@pytest.fixture(scope="session")
+def permission_ids(engine) -> tuple[uuid.UUID, ...]:
+    """Ids of the seeded permissions; they never change during a run"""
+    with engine.connect() as connection:
+        return tuple(connection.execute(select(Permission.id)).scalars())
+
+@pytest.fixture(scope="session")
+def hashed_test_password() -> str:
+    """bcrypt hash of the shared test password, computed once for tests to assign to password_hash"""
+    user = User()
+    user.set_password(SEED_USER["password"])
+    return user.password_hash
+
+@pytest.fixture(scope="session")
+def seeded_user(engine, pro_plan, permission_ids, hashed_test_password) -> uuid.UUID:
+    """Verified user with every permission and an active Pro subscription, committed once per run"""
+    with Session(bind=engine, expire_on_commit=False) as session:
+        user = User(
+            first_name=SEED_USER["first_name"],
+            last_name=SEED_USER["last_name"],
+            email=SEED_USER["email"],
+        )
+        user.password_hash = hashed_test_password
+        user.is_active = True
+        user.is_verified = True
+        session.add(user)
+        session.flush()
+        session.execute(insert(user_permissions_association), [
+            {"user_id": user.id, "permission_id": permission_id}
+            for permission_id in permission_ids
+        ])
+        plan = session.get(SubscriptionPlan, pro_plan)
+        payment = Payment.create_from_paystack_response(user_id=user.id, data={
+            "id": 1000001,
+            "subscription_code": "SUB_SEEDED",
+            "customer": {"email": user.email},
+            "plan": {"plan_code": plan.plan_code},
+            "amount": 1500,
+            "status": "success",
+            "subscription_plan_id": plan.id,
+            "subscription_start_at": datetime.now(timezone.utc),
+            "subscription_end_at": datetime.now(timezone.utc) + timedelta(days=plan.days),
+        })
+        session.add(payment)
+        session.commit()
+        return user.id
+
+@pytest.fixture(scope="session")
+def seeded_project(engine, seeded_user) -> uuid.UUID:
+    """Empty project owned by the seeded user, committed once per run"""
+    with Session(bind=engine, expire_on_commit=False) as session:
+        project = Project(name="Alpha", description="First", owner_id=seeded_user)
+        session.add(project)
+        session.commit()
+        return project.id
+
+@pytest.fixture(scope="session")
+def access_token(engine, seeded_user, jwt_for) -> str:
+    """Access token for the seeded user, signed once per run"""
+    with Session(bind=engine) as session:
+        return jwt_for(session.get(User, seeded_user), GRANTED_SCOPES)
+
+@pytest.fixture(scope="session")
+def jwt_for(test_settings):
+    """Sign access tokens for test users, reusing the token already signed for the same user and scopes"""
+    tokens: dict[tuple[uuid.UUID, tuple[str, ...]], str] = {}
+
+    def sign(user: User, scopes: tuple[str, ...] = ()) -> str:
+        key = (user.id, tuple(sorted(scopes)))
+        if key not in tokens:
+            tokens[key] = user.create_jwt_token(
+                secret=test_settings.secret_key,
+                algorithm=test_settings.algorithm,
+                expiry_seconds=test_settings.access_token_expiry_seconds,
+                **({"granted_scopes": list(scopes)} if scopes else {})
+            )
+        return tokens[key]
+
+    return sign
+
+@pytest.fixture
+def plan(db, pro_plan) -> SubscriptionPlan:
+    return db.get(SubscriptionPlan, pro_plan)
+
+@pytest.fixture
+def user(db, seeded_user) -> User:
+    return db.get(User, seeded_user)
+
+@pytest.fixture
+def project(db, seeded_project) -> Project:
+    return db.get(Project, seeded_project)
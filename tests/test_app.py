@@ -1,96 +1,31 @@
 import io
 from unittest.mock import patch
 import pytest
-from moto import mock_aws
-import pytest
-from models import Project, User, Permission, SubscriptionPlan, Field, FieldType, Receipt
-from datetime import datetime
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from datetime import timezone, datetime, timedelta
-
-from models.subscriptions import Payment
-
-TEST_USER = {
-    "first_name": "John",
-    "last_name": "Doe", 
-    "email": "kahenya0@gmail.com",
-    "password": "SuperS3cr3t@Pass"
+from api.data import save_csv
+from models import DataValue, Project, Field, FieldType, Receipt
+
+_COORDINATES = {"x":0,"y":2,"width":123,"height":85}
+_EXTRACT_RESULT = {
+    "first_name": {"value": "john", "coordinates": _COORDINATES},
+    "last_name": {"value": "doe", "coordinates": _COORDINATES},
+    "age": {"value": 29, "coordinates": _COORDINATES},
 }
+_CSV_BYTES = b"fake,csv,data"
+_PDF_CONTENT = b"dummy-pdf-content"
 
-def create_user(db, test_settings):
-    user: User = User(
-        first_name=TEST_USER["first_name"],
-        last_name=TEST_USER["last_name"],
-        email=TEST_USER["email"],
-    )
-    user.set_password(TEST_USER["password"])
-    for permission in db.execute(select(Permission)).scalars().all():
-        user.scopes.append(permission)
-    user.is_active = True
-    user.is_verified = True
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    access_token = user.create_jwt_token(
-                            test_settings.secret_key, 
-                            algorithm=test_settings.algorithm,
-                            expiry_seconds=test_settings.access_token_expiry_seconds,
-                            granted_scopes=[
-                                "write:projects",
-                                "read:projects",
-                                "delete:projects",
-                                "read:fields",
-                                "write:fields",
-                                "delete:fields",
-                                "read:receipts",
-                                "write:receipts",
-                                "process:projects",
-                                "read:data",
-                                "write:data",
-                                "export:data",
-                            ]
-                        )
-    return user, access_token
-
-def add_subscription(db: Session, user: User):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000, 
-        currency="KES",
-        invoice_limits=1000
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
-    payload = {
-        "event": "charge.success",
-        "data": {
-            "id": 1828382,
-            "subscription_code": "SUB0001",
-            "customer": {"email": user.email},
-            "plan": {"plan_code": "pro-code"},
-            "amount": 1500,
-            "status": "success",
-        }
-    }
-    data = payload["data"]
-    data["subscription_plan_id"] = plan.id
-    data["subscription_start_at"] = datetime.now(timezone.utc)
-    data["subscription_end_at"] = datetime.now(timezone.utc) + timedelta(days=plan.days)
-    payment = Payment.create_from_paystack_response(user_id=user.id, data=data)
-    db.add(payment)
-    db.commit()
-    db.refresh(payment)
+@pytest.fixture(scope="module", autouse=True)
+def extraction_mocks():
+    """Stub the OCR/LLM extractor and the CSV writer once for the whole module"""
+    with patch("api.data.save_csv", side_effect=lambda *args, **kwargs: io.BytesIO(_CSV_BYTES)) as mock_save_csv, \
+         patch("utils.extractor.InvoiceExtractor.extract_from_document", return_value=_EXTRACT_RESULT) as mock_extract_from_document:
+        yield mock_save_csv, mock_extract_from_document
 
 @pytest.mark.asyncio
-async def test_projects(client, db, test_settings):
-    user, access_token = create_user(db,test_settings)
+async def test_projects(aclient, db, user, access_token):
     payload = {"name": "Test Project", "description": "Some desc"}
-    add_subscription(db, user)
-    response = client.post(
+    response = await aclient.post(
                         "/api/v1/projects", 
                         json=payload,
                         cookies={"access_token":access_token}
@@ -101,174 +36,190 @@ async def test_projects(client, db, test_settings):
     project = Project(name="Alpha", description="First", owner_id=user.id)
     db.add(project)
     db.commit()
-    response = client.get("/api/v1/projects", cookies={"access_token":access_token})
+    response = await aclient.get("/api/v1/projects", cookies={"access_token":access_token})
     assert response.status_code == 200
     assert any(p["name"] == "Alpha" for p in response.json()["data"])
-    response = client.get(f"/api/v1/projects/{project.id}", cookies={"access_token":access_token})
+    response = await aclient.get(f"/api/v1/projects/{project.id}", cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["name"] == project.name
-    response = client.put(f"/api/v1/projects/{project.id}", json={"name": "Alpha1"}, cookies={"access_token":access_token})
+    response = await aclient.put(f"/api/v1/projects/{project.id}", json={"name": "Alpha1"}, cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["name"] == "Alpha1"
-    response = client.delete(f"/api/v1/projects/{project.id}", cookies={"access_token":access_token})
+    response = await aclient.delete(f"/api/v1/projects/{project.id}", cookies={"access_token":access_token})
     assert response.status_code == 204
 
-def add_project(db:Session, user: User):
-    project = Project(name="Alpha", description="First", owner_id=user.id)
-    db.add(project)
-    db.commit()
-    db.refresh(project)
-    return project
+@pytest.mark.asyncio
+async def test_list_projects_query_count(aclient, db, user, access_token, executed_statements):
+    def add_project_with_fields(name: str):
+        project = Project(name=name, description="With fields", owner_id=user.id)
+        parent = Field(name="items", type=FieldType.ARRAY, description="Items", project=project)
+        Field(name="price", type=FieldType.NUMBER, description="Price", project=project, parent=parent)
+        db.add(project)
+        db.commit()
+
+    async def count_list_statements() -> int:
+        db.expire_all()
+        executed_statements.clear()
+        response = await aclient.get("/api/v1/projects", cookies={"access_token":access_token})
+        assert response.status_code == 200
+        return len(executed_statements)
+
+    add_project_with_fields("Alpha")
+    one_project = await count_list_statements()
+    add_project_with_fields("Beta")
+    add_project_with_fields("Gamma")
+    assert await count_list_statements() == one_project
 
 @pytest.mark.asyncio
-async def test_fields(client, db, test_settings):
-    user, access_token = create_user(db,test_settings)
-    add_subscription(db,user)
-    project = add_project(db, user)
+async def test_fields(aclient, db, project, access_token):
     payload = {
         "name": "total_amount",
         "type": "number",
         "description": "Total amount paid"
     }
-    response = client.post(f"/api/v1/projects/{project.id}/fields/", json=payload, cookies={"access_token":access_token})
+    response = await aclient.post(f"/api/v1/projects/{project.id}/fields/", json=payload, cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["name"] == "total_amount"
     assert response.json()["type"] == "number"
     parent = Field(name="metadata", type=FieldType.OBJECT, description="meta", project_id=project.id)
     db.add(parent)
     db.commit()
-    db.refresh(parent)
     payload = {
         "name": "author",
         "type": "string",
         "description": "Author Name"
     }
-    response = client.post(f"/api/v1/projects/{project.id}/fields/{parent.id}/add_child", json=payload, cookies={"access_token":access_token})
+    response = await aclient.post(f"/api/v1/projects/{project.id}/fields/{parent.id}/add_child", json=payload, cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["parent"]["id"] == str(parent.id)
 
-    response = client.get(f"/api/v1/projects/{project.id}/fields/", cookies={"access_token":access_token})
+    response = await aclient.get(f"/api/v1/projects/{project.id}/fields/", cookies={"access_token":access_token})
     assert response.status_code == 200
     results = response.json()["data"]
     assert any(f["name"] == "author" for f in results)
 
-    response = client.get(f"/api/v1/projects/{project.id}/fields/{parent.id}", cookies={"access_token":access_token})
+    response = await aclient.get(f"/api/v1/projects/{project.id}/fields/{parent.id}", cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["name"] == "metadata"
 
     payload = {"description": "Updated description for metadata"}
-    response = client.put(f"/api/v1/projects/{project.id}/fields/{parent.id}", json=payload,  cookies={"access_token":access_token})
+    response = await aclient.put(f"/api/v1/projects/{project.id}/fields/{parent.id}", json=payload,  cookies={"access_token":access_token})
     assert response.status_code == 200
     assert response.json()["description"] == "Updated description for metadata"
 
-    response = client.delete(f"/api/v1/projects/{project.id}/fields/{parent.id}", cookies={"access_token":access_token})
+    response = await aclient.delete(f"/api/v1/projects/{project.id}/fields/{parent.id}", cookies={"access_token":access_token})
     assert response.status_code == 204
 
-@pytest.mark.asyncio
-async def test_receipts(client, db, test_settings):
-    user, access_token = create_user(db,test_settings)
-    add_subscription(db,user)
-    project = add_project(db, user)
-    headers = {"Authorization": f"Bearer {access_token}"}
-    with mock_aws():
-        content = io.BytesIO(b"dummy-pdf-content")
-        content.name = "receipt.pdf"
-        response = client.post(
-            f"/api/v1/projects/{project.id}/receipts/",
-            files={"file": ("receipt.pdf", content, "application/pdf")},
-            cookies={"access_token":access_token}
-        )
-        receipt_id = response.json()["id"]
-        assert response.status_code == 200
-        assert response.json()["file_name"] == "receipt.pdf"
-        assert response.json()["mime_type"] == "application/pdf"
-        
-        content = io.BytesIO(b"garbage")
-        content.name = "receipt.exe"
-        response = client.post(
-            f"/api/v1/projects/{project.id}/receipts/",
-            files={"file": ("receipt.exe", content, "application/x-msdownload")},
-            cookies={"access_token":access_token}
-        )
-        assert response.status_code == 400
-        assert "Invalid file type" in response.text
+async def _upload(aclient, project_id, access_token: str, file_name: str, content: bytes, mime_type: str):
+    return await aclient.post(
+        f"/api/v1/projects/{project_id}/receipts/",
+        files={"file": (file_name, content, mime_type)},
+        cookies={"access_token":access_token}
+    )
 
-        response = client.get(f"/api/v1/projects/{project.id}/receipts/", cookies={"access_token":access_token})
-        assert response.status_code == 200
-        results = response.json()["data"]
-        assert any(r["file_name"] == "receipt.pdf" for r in results)
+@pytest.mark.asyncio
+async def test_receipts(aclient, db, project, access_token):
+    response = await _upload(aclient, project.id, access_token, "receipt.pdf", _PDF_CONTENT, "application/pdf")
+    receipt_id = response.json()["id"]
+    assert response.status_code == 200
 
-        response = client.get(f"/api/v1/projects/{project.id}/receipts/{receipt_id}", cookies={"access_token":access_token})
-        assert response.status_code == 200
-        assert response.json()["file_name"] == "receipt.pdf"
+    response = await aclient.get(f"/api/v1/projects/{project.id}/receipts/", cookies={"access_token":access_token})
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert any(r["file_name"] == "receipt.pdf" for r in results)
 
-        response = client.put(
-            f"/api/v1/projects/{project.id}/receipts/{receipt_id}/",
-            json={"status": "completed"},
-            cookies={"access_token":access_token}
-        )
-        assert response.status_code == 200
-        assert response.json()["status"] == "completed"
+    response = await aclient.get(f"/api/v1/projects/{project.id}/receipts/{receipt_id}", cookies={"access_token":access_token})
+    assert response.status_code == 200
+    assert response.json()["file_name"] == "receipt.pdf"
 
-        response = client.put(
-            f"/api/v1/projects/{project.id}/receipts/{receipt_id}/",
-            json={"status": "destroyed"},
-            cookies={"access_token":access_token}
-        )
-        assert response.status_code == 400
-        assert "Invalid status" in response.text
+@pytest.mark.parametrize("file_name,content,mime_type,expected_status,expected", [
+    ("receipt.pdf", _PDF_CONTENT, "application/pdf", 200, {"file_name": "receipt.pdf", "mime_type": "application/pdf"}),
+    ("receipt.exe", b"garbage", "application/x-msdownload", 400, {"detail": "Invalid file type. Only JPEG, PNG, GIF, and PDF files are allowed."}),
+])
+@pytest.mark.asyncio
+async def test_upload_receipt(aclient, project, access_token, file_name, content, mime_type, expected_status, expected):
+    response = await _upload(aclient, project.id, access_token, file_name, content, mime_type)
+    assert response.status_code == expected_status
+    body = response.json()
+    assert {key: body.get(key) for key in expected} == expected
+
+@pytest.mark.parametrize("new_status,expected_status,expected", [
+    ("completed", 200, {"status": "completed"}),
+    ("failed", 200, {"status": "failed"}),
+    ("destroyed", 400, {"detail": "Invalid status update"}),
+])
+@pytest.mark.asyncio
+async def test_update_receipt_status(aclient, db, project, access_token, new_status, expected_status, expected):
+    receipt = Receipt(project_id=project.id,file_path="file/receipt.pdf",file_name="receipt.pdf",mime_type="application/pdf")
+    db.add(receipt)
+    db.commit()
+    response = await aclient.put(
+        f"/api/v1/projects/{project.id}/receipts/{receipt.id}/",
+        json={"status": new_status},
+        cookies={"access_token":access_token}
+    )
+    assert response.status_code == expected_status
+    body = response.json()
+    assert {key: body.get(key) for key in expected} == expected
 
 
 def prepare_project(db:Session, project: Project) -> Project:
-    field1 = Field(name="first_name",description="first name", type=FieldType.STRING, project_id = project.id)
-    field2 = Field(name="last_name",description="last name", type=FieldType.STRING, project_id = project.id)
-    field3 = Field(name="age",description="age", type=FieldType.NUMBER, project_id = project.id)
-    receipt1 = Receipt(project_id=project.id,file_path="file/receipt1.pdf",file_name="receipt1.pdf",mime_type="application/pdf")
-    receipt2 = Receipt(project_id=project.id,file_path="file/receipt2.pdf",file_name="receipt2.pdf",mime_type="application/pdf")
-    receipt3 = Receipt(project_id=project.id,file_path="file/receipt3.pdf",file_name="receipt3.pdf",mime_type="application/pdf")
-    db.add_all([field1,field2, field3])
-    db.add_all([receipt1,receipt2, receipt3])
+    db.execute(insert(Field), [
+        {"name": "first_name", "description": "first name", "type": FieldType.STRING, "project_id": project.id},
+        {"name": "last_name", "description": "last name", "type": FieldType.STRING, "project_id": project.id},
+        {"name": "age", "description": "age", "type": FieldType.NUMBER, "project_id": project.id},
+    ])
+    db.execute(insert(Receipt), [
+        {"project_id": project.id, "file_path": f"file/{name}", "file_name": name, "mime_type": "application/pdf"}
+        for name in ("receipt1.pdf", "receipt2.pdf", "receipt3.pdf")
+    ])
     db.commit()
-    db.refresh(project)
     return project
 
-@patch("api.data.save_csv")
-@patch("utils.extractor.InvoiceExtractor.extract_from_document")
 @pytest.mark.asyncio
-async def test_process_project(mock_extract_from_document, mock_save_csv, client,db,test_settings):
-    user, access_token = create_user(db,test_settings)
-    add_subscription(db,user)
-    project = add_project(db, user)
+async def test_process_project(extraction_mocks, aclient, db, project, access_token):
+    mock_save_csv, _ = extraction_mocks
+    mock_save_csv.reset_mock()
     project = prepare_project(db,project)
 
-    mock_save_csv.return_value = io.BytesIO(b"fake,csv,data")
-    mock_extract_from_document.return_value = {
-        "first_name": {
-            "value": "john", "coordinates":{"x":0,"y":2,"width":123,"height":85}
-        },
-        "last_name": {
-            "value": "doe", "coordinates":{"x":0,"y":2,"width":123,"height":85}
-        },
-        "age": {
-            "value": 29, "coordinates":{"x":0,"y":2,"width":123,"height":85}
-        }
-    }
+    response = await aclient.post(f"/api/v1/projects/{project.id}/process", cookies={"access_token":access_token})
+    data_value_id = response.json()["data"][0]["data_values"][0]["id"]
+    assert response.status_code == 200
+    # Data endpoints
+    response = await aclient.get(f"/api/v1/projects/{project.id}/data", cookies={"access_token":access_token})
+    assert response.status_code == 200
+    response = await aclient.put(f"/api/v1/projects/{project.id}/receipts/{project.receipts[0].id}/data/{data_value_id}", cookies={"access_token":access_token}, json={"value": "a"})
+    assert response.status_code == 200
+    response = await aclient.get(f"/api/v1/projects/{project.id}/data/csv", cookies={"access_token":access_token})
+    assert response.status_code == 200
+    # Files (Download) endpoint
+    assert len(response.json()["url"]) > 0
+    export_url = response.json()["url"].replace("http://testserver","")
+    response = await aclient.request("GET", export_url, cookies={"access_token":access_token}, follow_redirects=False)
+    assert response.status_code == 200
     
-    with mock_aws():
-        response = client.post(f"/api/v1/projects/{project.id}/process", cookies={"access_token":access_token})
-        data_value_id = response.json()["data"][0]["data_values"][0]["id"]
-        assert response.status_code == 200
-        # Data endpoints
-        response = client.get(f"/api/v1/projects/{project.id}/data", cookies={"access_token":access_token})
-        assert response.status_code == 200
-        response = client.put(f"/api/v1/projects/{project.id}/receipts/{project.receipts[0].id}/data/{data_value_id}", cookies={"access_token":access_token}, json={"value": "a"})
-        assert response.status_code == 200
-        response = client.get(f"/api/v1/projects/{project.id}/data/csv", cookies={"access_token":access_token})
-        assert response.status_code == 200
-        # Files (Download) endpoint
-        assert len(response.json()["url"]) > 0
-        export_url = response.json()["url"].replace("http://testserver","")
-        response = client.request("GET", export_url, cookies={"access_token":access_token}, follow_redirects=False)
-        assert response.status_code == 200
-        
-    mock_save_csv.assert_called_once()
\ No newline at end of file
+    mock_save_csv.assert_called_once()
+
+def test_save_csv_query_count(db, project, executed_statements):
+    # nested two levels deep so every value's name comes from a parent chain
+    meta = Field(name="meta", type=FieldType.OBJECT, description="Meta", project_id=project.id)
+    items = Field(name="items", type=FieldType.ARRAY, description="Items", project_id=project.id, parent=meta)
+    price = Field(name="price", type=FieldType.NUMBER, description="Price", project_id=project.id, parent=items)
+    db.add_all([meta, items, price])
+    for n in range(3):
+        receipt = Receipt(project_id=project.id,file_path=f"file/receipt{n}.pdf",file_name=f"receipt{n}.pdf",mime_type="application/pdf")
+        db.add(receipt)
+        db.add_all([DataValue(field=price, receipt=receipt, value=str(row), row=row) for row in range(2)])
+    db.commit()
+    project_id = project.id
+    db.expunge_all()
+    # loading the project also opens the next savepoint, so neither is counted below
+    project = db.get(Project, project_id)
+
+    executed_statements.clear()
+    csv_file = save_csv(db, project)
+    # the fields, the receipts and their data values
+    assert len(executed_statements) == 3
+    header = csv_file.getvalue().splitlines()[0]
+    assert b"meta_items_price_0" in header
+    assert b"meta_items_price_1" in header
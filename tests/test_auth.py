@@ -1,4 +1,3 @@
-import base64
 import pytest
 from unittest.mock import patch, MagicMock
 from sqlalchemy import select
@@ -20,22 +19,16 @@ class TestAuthEndpoints:
             "password": "SuperS3cr3t@Pass"
         }
         
-    def get_auth_headers(self, test_settings):
-        """Helper to get client auth headers"""
-        credentials = base64.b64encode(f"{test_settings.client_id}:{test_settings.client_secret}".encode()).decode()
-        return {"Authorization": f"Basic {credentials}"}
-
     @patch("api.auth.send_verification_email")
-    def test_signup(self, mock_send_email, client, test_settings, db):
+    def test_signup(self, mock_send_email, client, test_settings, db, client_auth_headers):
         """Test user signup - success and failure scenarios"""
         mock_send_email.return_value = True
-        headers = self.get_auth_headers(test_settings)
         
         # Test successful signup
         response = client.post(
             url="/api/v1/auth/signup",
             json=self.test_user_data,
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 201
         assert response.json()["message"] == "User created successfully. Check your email for otp code"
@@ -45,7 +38,7 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/signup",
             json=self.test_user_data,
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert f"User with email {self.test_user_data['email']} already exists" in response.json()["detail"]
@@ -58,22 +51,21 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/signup",
             json=weak_password_data,
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 422
 
     @patch("api.auth.send_verification_email")
-    def test_get_otp(self, mock_send_email, client, test_settings, db):
+    def test_get_otp(self, mock_send_email, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test OTP generation - success and failure scenarios"""
         mock_send_email.return_value = True
-        headers = self.get_auth_headers(test_settings)
         
         user = User(
             first_name=self.test_user_data["first_name"],
             last_name=self.test_user_data["last_name"],
             email=self.test_user_data["email"]
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
@@ -81,7 +73,7 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/otp/get",
             json={"email": self.test_user_data["email"]},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert f"OTP code sent to {self.test_user_data['email']}" in response.json()["message"]
@@ -90,21 +82,20 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/otp/get",
             json={"email": "nonexistent@example.com"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 404
         assert "User not found" in response.json()["detail"]
 
-    def test_check_otp(self, client, test_settings, db):
+    def test_check_otp(self, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test OTP verification - success and failure scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         user = User(
             first_name=self.test_user_data["first_name"],
             last_name=self.test_user_data["last_name"],
             email=self.test_user_data["email"]
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         permission = db.execute(select(Permission).where(Permission.codename == "read:profile")).scalar_one_or_none()        
         user.scopes.append(permission)
         db.add(user)
@@ -117,7 +108,7 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/otp/check",
             json={"email": self.test_user_data["email"], "code": "12345"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "User Email Verified" in response.json()["message"]
@@ -126,7 +117,7 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/otp/check",
             json={"email": self.test_user_data["email"], "code": "wrong"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert "Invalid or expired otp code" in response.json()["detail"]
@@ -135,14 +126,13 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/otp/check",
             json={"email": "nonexistent@example.com", "code": "12345"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 404
         assert "Missing or Deactivated User" in response.json()["detail"]
 
-    def test_token_login(self, client, test_settings, db):
+    def test_token_login(self, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test login token endpoint - success and failure scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         # Create verified user
         user = User(
@@ -152,7 +142,7 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         permission = db.execute(select(Permission).where(Permission.codename == "read:profile")).scalar_one_or_none()        
         user.scopes.append(permission)
         db.add(user)
@@ -166,7 +156,7 @@ class TestAuthEndpoints:
                 "grant_type": "password",
                 "remember_me": True
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert response.json().get("success") == True
@@ -181,7 +171,7 @@ class TestAuthEndpoints:
                 "grant_type": "password",
                 "remember_me": True
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 401
         assert "Invalid Username or Password" in response.json()["detail"]
@@ -198,7 +188,7 @@ class TestAuthEndpoints:
                 "grant_type": "password",
                 "remember_me": True
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert "User not verified" in response.json()["detail"]
@@ -216,7 +206,7 @@ class TestAuthEndpoints:
                 "grant_type": "password",
                 "remember_me": True
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert "Inactive user" in response.json()["detail"]
@@ -233,14 +223,13 @@ class TestAuthEndpoints:
                 "grant_type": "authorization_code",
                 "remember_me": True
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert "unsupported_grant_type" in response.json()["detail"]["error"]
 
-    def test_refresh_token(self, client, test_settings, db):
+    def test_refresh_token(self, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test token refresh - success and failure scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         # Create verified user
         user = User(
@@ -250,7 +239,7 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
@@ -266,7 +255,7 @@ class TestAuthEndpoints:
                 "grant_type": "refresh_token"
             },
             cookies=cookies,
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "access_token" in response.cookies
@@ -280,14 +269,13 @@ class TestAuthEndpoints:
                 "grant_type": "refresh_token"
             },
             cookies= {"refresh_token": "invalid_token"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 401
         assert "invalid_grant" in response.json()["detail"]["error"]
 
-    def test_revoke_token(self, client, test_settings, db):
+    def test_revoke_token(self, client, test_settings, db, hashed_test_password, client_auth_headers, jwt_for):
         """Test token revocation - success scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         # Create user and tokens
         user = User(
@@ -297,15 +285,11 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
-        access_token = user.create_jwt_token(
-            secret=test_settings.secret_key,
-            algorithm=test_settings.algorithm,
-            expiry_seconds=test_settings.access_token_expiry_seconds
-        )
+        access_token = jwt_for(user)
         refresh_token = user.create_refresh_token(db)
         
         # Test revoking access token
@@ -315,7 +299,7 @@ class TestAuthEndpoints:
                 "token": access_token,
                 "token_type_hint": "access_token"
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "Token revocation successful" in response.json()["message"]
@@ -327,16 +311,15 @@ class TestAuthEndpoints:
                 "token": refresh_token,
                 "token_type_hint": "refresh_token"
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "Token revocation successful" in response.json()["message"]
 
     @patch("api.auth.send_password_reset_email")
-    def test_forgot_password(self, mock_send_email, client, test_settings, db):
+    def test_forgot_password(self, mock_send_email, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test forgot password - success and failure scenarios"""
         mock_send_email.return_value = True
-        headers = self.get_auth_headers(test_settings)
         
         # Create user
         user = User(
@@ -344,7 +327,7 @@ class TestAuthEndpoints:
             last_name=self.test_user_data["last_name"],
             email=self.test_user_data["email"]
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
@@ -352,7 +335,7 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/password/forgot",
             json={"email": self.test_user_data["email"]},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "password reset link" in response.json()["message"]
@@ -361,14 +344,13 @@ class TestAuthEndpoints:
         response = client.post(
             url="/api/v1/auth/password/forgot",
             json={"email": "nonexistent@example.com"},
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 400
         assert "not found" in response.json()["detail"]
 
-    def test_reset_password(self, client, test_settings, db):
+    def test_reset_password(self, client, test_settings, db, hashed_test_password, client_auth_headers):
         """Test password reset - success and failure scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         # Create user
         user = User(
@@ -376,7 +358,7 @@ class TestAuthEndpoints:
             last_name=self.test_user_data["last_name"],
             email=self.test_user_data["email"]
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
@@ -400,7 +382,7 @@ class TestAuthEndpoints:
                 "token": reset_token,
                 "new_password": "NewS3cr3t@Pass"
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 200
         assert "Password has been reset successfully" in response.json()["message"]
@@ -413,14 +395,13 @@ class TestAuthEndpoints:
                 "token": "invalid_token",
                 "new_password": "NewS3cr3t@Pass"
             },
-            headers=headers
+            headers=client_auth_headers
         )
         assert response.status_code == 403
         assert "Invalid or Expired Reset Token" in response.json()["detail"]
 
-    def test_change_password(self, client, test_settings, db):
+    def test_change_password(self, client, test_settings, db, hashed_test_password, jwt_for):
         """Test password change - success and failure scenarios"""
-        headers = self.get_auth_headers(test_settings)
         
         # Create verified user with permissions
         user = User(
@@ -430,7 +411,7 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         
         # Add required permission
         permission = db.execute(select(Permission).where(Permission.codename == "write:profile")).scalar_one_or_none()        
@@ -439,12 +420,7 @@ class TestAuthEndpoints:
         db.commit()
         
         # Get access token
-        access_token = user.create_jwt_token(
-            secret=test_settings.secret_key,
-            algorithm=test_settings.algorithm,
-            expiry_seconds=test_settings.access_token_expiry_seconds,
-            granted_scopes=["write:profile"]
-        )
+        access_token = jwt_for(user, ("write:profile",))
         
         cookies = {"access_token": access_token}
         
@@ -483,7 +459,7 @@ class TestAuthEndpoints:
         )
         assert response.status_code == 422
 
-    def test_get_user_profile(self, client, test_settings, db):
+    def test_get_user_profile(self, client, test_settings, db, hashed_test_password, jwt_for):
         """Test get user profile - success and failure scenarios"""
         # Create verified user with permissions
         user = User(
@@ -493,7 +469,7 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         
         # Add required permission
         permission = db.execute(select(Permission).where(Permission.codename == "read:profile")).scalar_one_or_none()        
@@ -502,12 +478,7 @@ class TestAuthEndpoints:
         db.commit()
         
         # Get access token
-        access_token = user.create_jwt_token(
-            secret=test_settings.secret_key,
-            algorithm=test_settings.algorithm,
-            expiry_seconds=test_settings.access_token_expiry_seconds,
-            granted_scopes=["read:profile"]
-        )
+        access_token = jwt_for(user, ("read:profile",))
         
         cookies = {"access_token": access_token}
         
@@ -525,7 +496,7 @@ class TestAuthEndpoints:
         assert response.status_code == 401
 
     @patch("api.auth.send_verification_email")
-    def test_update_user_profile(self, mock_send_email, client, test_settings, db):
+    def test_update_user_profile(self, mock_send_email, client, test_settings, db, hashed_test_password, jwt_for):
         """Test update user profile - success and failure scenarios"""
         mock_send_email.return_value = True
         
@@ -537,7 +508,7 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         
         # Add required permission
         permission = db.execute(select(Permission).where(Permission.codename == "write:profile")).scalar_one_or_none()        
@@ -546,12 +517,7 @@ class TestAuthEndpoints:
         db.commit()
         
         # Get access token
-        access_token = user.create_jwt_token(
-            secret=test_settings.secret_key,
-            algorithm=test_settings.algorithm,
-            expiry_seconds=test_settings.access_token_expiry_seconds,
-            granted_scopes=["write:profile"]
-        )
+        access_token = jwt_for(user, ("write:profile",))
         
         cookies = {"access_token": access_token}
         
@@ -586,7 +552,7 @@ class TestAuthEndpoints:
         )
         assert response.status_code == 401
 
-    def test_logout(self, client, test_settings, db):
+    def test_logout(self, client, test_settings, db, hashed_test_password, jwt_for):
         """Test user logout - success and failure scenarios"""
         # Create verified user
         user = User(
@@ -596,16 +562,12 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         db.add(user)
         db.commit()
         
         # Get access token
-        access_token = user.create_jwt_token(
-            secret=test_settings.secret_key,
-            algorithm=test_settings.algorithm,
-            expiry_seconds=test_settings.access_token_expiry_seconds
-        )
+        access_token = jwt_for(user)
         
         cookies = {"access_token": access_token}
         
@@ -628,14 +590,13 @@ class TestAuthEndpoints:
 
     @patch("api.auth.get_google_access_token")
     @patch("api.auth.get_google_userinfo")
-    def test_google_login(self, mock_get_google_userinfo, mock_get_google_access_token, client, test_settings, db):
+    def test_google_login(self, mock_get_google_userinfo, mock_get_google_access_token, client, test_settings, db, hashed_test_password, client_auth_headers):
         mock_get_google_access_token.return_value = {"access_token": "test_token"}
         mock_get_google_userinfo.return_value = {
             "email": self.test_user_data.get("email"),
             "given_name": self.test_user_data.get("first_name"),
             "family_name": self.test_user_data.get("last_name"),
         }
-        headers = self.get_auth_headers(test_settings)
         # Create verified user with permissions
         user = User(
             first_name=self.test_user_data["first_name"],
@@ -644,18 +605,17 @@ class TestAuthEndpoints:
             is_verified=True,
             is_active=True
         )
-        user.set_password(self.test_user_data["password"])
+        user.password_hash = hashed_test_password
         permission = db.execute(select(Permission).where(Permission.codename == "write:profile")).scalar_one_or_none()        
         user.scopes.append(permission)
         db.add(user)
         db.commit()
-        db.refresh(user)
         # test initialization of login
-        response = client.get("/api/v1/auth/google/login",headers=headers)
+        response = client.get("/api/v1/auth/google/login",headers=client_auth_headers)
         assert response.status_code == 200
         assert response.json()["redirect_to"] != None
         # test auth callback
-        response = client.post("/api/v1/auth/google/callback",headers=headers, json={"code": "fake_auth_code"})
+        response = client.post("/api/v1/auth/google/callback",headers=client_auth_headers, json={"code": "fake_auth_code"})
         print(response.text)
         assert response.status_code == 200
         assert response.json()["success"] == True
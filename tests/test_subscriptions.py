@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, patch
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 
-from models import SubscriptionPlan, User
+from models import User
 from models.subscriptions import Payment
 
 test_user_data = {
@@ -14,51 +14,29 @@ test_user_data = {
 }
 
 @pytest.mark.asyncio
-async def test_list_subscription_plans(client, db):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000, 
-        currency="KES",
-        benefits="benefit1$benefit2"
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
+async def test_list_subscription_plans(client, plan):
     response = client.get("/api/v1/subscriptions/plans")
     assert response.status_code == 200
     assert any(p["name"] == "Pro" for p in response.json()["data"])
 
-def create_user(db: Session):
+def create_user(db: Session, hashed_password: str):
     user: User = User(
         first_name=test_user_data["first_name"],
         last_name=test_user_data["last_name"],
         email=test_user_data["email"],
     )
-    user.set_password(test_user_data["password"])
+    user.password_hash = hashed_password
     user.is_active = True
     user.is_verified = True
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 @patch("api.subscriptions.initiate_paystack_payment", new_callable=AsyncMock)
 @pytest.mark.asyncio
-async def test_start_payment_success(mock_paystack, client, db, test_settings):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000,
-        currency="KES"
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
-    user = create_user(db=db)
-    access_token = user.create_jwt_token(test_settings.secret_key,algorithm=test_settings.algorithm,expiry_seconds=test_settings.access_token_expiry_seconds)
+async def test_start_payment_success(mock_paystack, client, db, plan, test_settings, hashed_test_password, jwt_for):
+    user = create_user(db=db, hashed_password=hashed_test_password)
+    access_token = jwt_for(user)
     mock_paystack.return_value = {"payment_url": "https://paystack.com/pay/abc123"}
     payload = {
         "plan_id": str(plan.id),
@@ -76,19 +54,9 @@ async def test_start_payment_success(mock_paystack, client, db, test_settings):
 
 @patch("api.subscriptions.verify_paystack_signature", new_callable=AsyncMock)
 @pytest.mark.asyncio
-async def test_webhook_subscription_create(mock_verify, client, db, test_settings):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000,
-        currency="KES"
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
+async def test_webhook_subscription_create(mock_verify, client, db, plan, test_settings, hashed_test_password):
     mock_verify.return_value = True
-    user = create_user(db=db)
+    user = create_user(db=db, hashed_password=hashed_test_password)
     payload = {
         "event": "subscription.create",
         "data": {
@@ -110,18 +78,8 @@ async def test_webhook_subscription_create(mock_verify, client, db, test_setting
 
 @patch("api.subscriptions.verify_paystack_signature", new_callable=AsyncMock)
 @pytest.mark.asyncio
-async def test_webhook_charge_success_creates_payment(mock_verify, client, db, test_settings):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000,
-        currency="KES"
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
-    user = create_user(db=db)
+async def test_webhook_charge_success_creates_payment(mock_verify, client, db, plan, test_settings, hashed_test_password):
+    user = create_user(db=db, hashed_password=hashed_test_password)
     mock_verify.return_value = True
     payload = {
         "event": "charge.success",
@@ -145,18 +103,8 @@ async def test_webhook_charge_success_creates_payment(mock_verify, client, db, t
 
 @patch("api.subscriptions.get_paystack_subscription_link", new_callable=AsyncMock)
 @pytest.mark.asyncio
-async def test_get_subscription_update_link(mock_link, client, db, test_settings):
-    plan = SubscriptionPlan(
-        name="Pro", 
-        description="Pro", 
-        plan_code="pro-code",
-        price=1000,
-        currency="KES"
-    )
-    db.add(plan)
-    db.commit()
-    db.refresh(plan)
-    user = create_user(db=db)
+async def test_get_subscription_update_link(mock_link, client, db, plan, test_settings, hashed_test_password, jwt_for):
+    user = create_user(db=db, hashed_password=hashed_test_password)
     payload = {
         "event": "charge.success",
         "data": {
@@ -175,8 +123,7 @@ async def test_get_subscription_update_link(mock_link, client, db, test_settings
     payment = Payment.create_from_paystack_response(user_id=user.id, data=data)
     db.add(payment)
     db.commit()
-    db.refresh(payment)
-    access_token = user.create_jwt_token(test_settings.secret_key,algorithm=test_settings.algorithm,expiry_seconds=test_settings.access_token_expiry_seconds)
+    access_token = jwt_for(user)
     mock_link.return_value = {"link": "https://paystack.com/manage/sub_test"}
     response = client.get(f"/api/v1/subscriptions/{payment.id}/update_subscription_link", cookies={"access_token":access_token})
     assert response.status_code == 200
@@ -1,23 +1,26 @@
-from typing import Optional, Sequence, TypeVar
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, TypeVar
 from fastapi import HTTPException, Query
-from pydantic import UUID4, BaseModel
+from pydantic import UUID4, BaseModel, TypeAdapter
 from sqlalchemy import exc, or_, select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import LoaderOption
 from models import Model
 from schemas import ListResponse
 from config import logger
 
-async def get_obj_or_404(db: Session, model: Model, id: UUID4) -> Model:
+async def get_obj_or_404(db: Session, model: Model, id: UUID4, options: Iterable[LoaderOption] = ()) -> Model:
     """
         Returns one object from the database by pk id or raise an exception:  sqlalchemy.orm.exc.NoResultFound if no result is found
+        options are loader options (e.g. selectinload) applied to the query
     """
     logger.info(f"Getting {model.__name__} with id: {id}")
     try:
-        return db.execute(select(model).where(model.id == id)).scalar_one()
+        return db.execute(select(model).where(model.id == id).options(*options)).scalar_one()
     except exc.NoResultFound:
         raise HTTPException(status_code=404,detail={"message":f"{model.__name__} with id {id} not found"})
 
-async def filter_objects(db: Session, model: Model, params: dict = {}, sort_by:str = "created_at,asc" ) -> Sequence[Model]:
+async def filter_objects(db: Session, model: Model, params: dict = {}, sort_by:str = "created_at,asc", options: Iterable[LoaderOption] = ()) -> Sequence[Model]:
     """
         Returns a list of objects from the database filtered by the given params
     """
@@ -37,7 +40,7 @@ async def filter_objects(db: Session, model: Model, params: dict = {}, sort_by:s
             'contains': lambda col, val: col.contains(val),
             'in': lambda col, val: col.in_(val),
         }
-        query = select(model)
+        query = select(model).options(*options)
         for key, value in params.items():
             if '__' in key:
                 column_name, condition = key.split('__', 1)
@@ -52,9 +55,9 @@ async def filter_objects(db: Session, model: Model, params: dict = {}, sort_by:s
         logger.error(f"Error: {str(e)} filtering {model.__tablename__} with params: {params}")
         raise e
     
-async def search_objects(db: Session, model: Model, q: str) -> Sequence[Model]:
+async def search_objects(db: Session, model: Model, q: str, options: Iterable[LoaderOption] = ()) -> Sequence[Model]:
     logger.info(f"Searching {model.__tablename__} with query: {q}")
-    query = select(model)
+    query = select(model).options(*options)
     conditions = []
     for column in model.__table__.columns:
         if column.type.python_type == str:
@@ -63,6 +66,11 @@ async def search_objects(db: Session, model: Model, q: str) -> Sequence[Model]:
         query = query.where(or_(*conditions))
     return db.scalars(query).all()
 
+@lru_cache(maxsize=None)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    """Build the list validator for a response schema once and reuse it across requests"""
+    return TypeAdapter(List[schema])
+
 async def paginate(
                     db: Session, 
                     model: Model,
@@ -71,18 +79,19 @@ async def paginate(
                     page: int = Query(1, ge=1),
                     size: int = Query(10, ge=1, le=100),
                     sort_by: str = "created_at,asc",
+                    options: Iterable[LoaderOption] = (),
                     **params
                 ) -> ListResponse:
     if q:
-        data = await search_objects(db=db, model=model,q=q)
+        data = await search_objects(db=db, model=model,q=q,options=options)
     elif params and len(params) > 0:
-        data = await filter_objects(db=db, model=model,params=params,sort_by=sort_by)
+        data = await filter_objects(db=db, model=model,params=params,sort_by=sort_by,options=options)
     else:
-        data = await filter_objects(db=db, model=model, params={},sort_by=sort_by)
+        data = await filter_objects(db=db, model=model, params={},sort_by=sort_by,options=options)
     offset = (page - 1) * size
     total = len(data)
     paginated_items = data[offset:offset + size]
-    paginated_items = [schema.model_validate(item) for item in paginated_items]
+    paginated_items = _list_adapter(schema).validate_python(paginated_items, from_attributes=True)
     return ListResponse(**{
         "total": total,
         "page": page,
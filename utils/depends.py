@@ -1,8 +1,8 @@
 import base64
+import hmac
 from datetime import datetime, timezone
-import hashlib
 from typing import Annotated, Any, Dict, Optional, Tuple
-from sqlalchemy import create_engine, func, select
+from sqlalchemy import create_engine, select
 from fastapi import Depends, HTTPException, Header, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session, sessionmaker
 from models.subscriptions import Payment
 from models.auth import RevokedToken,User
 from config import get_settings, logger
+from utils.helpers import hash_token, set_current_request
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
@@ -39,15 +40,13 @@ def get_db():
             logger.info("Closing database connection")
             db.close()
             
-async def get_app(client_id: Annotated[str, Header()], client_secret: Annotated[str, Header()]) -> Tuple[str, str]:
-    if client_id == settings.client_id and client_secret == settings.client_secret:
-        return (client_id, client_secret)
-    else:
-        raise HTTPException(status_code=401,detail={"message":"Client credentials are invalid"})
-    
+async def set_request_context(request: Request) -> None:
+    """Expose the current request to response schemas; async so it runs in the endpoint's context"""
+    set_current_request(request)
+
 def is_token_revoked(token: str, db: Session) -> bool:
     """Check if token is revoked"""
-    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    token_hash = hash_token(token)
     revoked_token = db.query(RevokedToken).filter(
         RevokedToken.token_hash == token_hash,
         RevokedToken.expires_at > datetime.now(tz=timezone.utc)
@@ -96,7 +95,7 @@ async def get_app(authorization: Annotated[str, Header(alias="Authorization")])
         decoded_credentials = base64.b64decode(encoded_credentials).decode('utf-8')
         client_id, client_secret = decoded_credentials.split(':', 1)
         settings = get_settings()
-        if client_id == settings.client_id and client_secret == settings.client_secret:
+        if client_id == settings.client_id and hmac.compare_digest(client_secret.encode('utf-8'), settings.client_secret.encode('utf-8')):
             return (client_id, client_secret)
         else:
             raise HTTPException(
@@ -136,7 +135,7 @@ def require_subscription(required_scope: str):
         payment: Payment | None = db.execute(select(Payment)
                                     .where(
                                         Payment.user_id == scoped_user.id,
-                                        Payment.subscription_end_at > func.now()  # Check if subscription is active
+                                        Payment.is_active
                                     )).scalar_one_or_none()
         if not payment:
             raise HTTPException(
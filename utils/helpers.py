@@ -1,7 +1,10 @@
+import asyncio
 import hashlib
 import hmac
+import os
 import re
 import secrets
+import shutil
 import subprocess
 from typing import Dict, List, Tuple, Optional
 from fastapi import HTTPException, Request, UploadFile
@@ -11,23 +14,49 @@ import contextvars
 
 from config import settings, logger
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
 request_context: contextvars.ContextVar[Optional[Request]] = contextvars.ContextVar('request', default=None)
+files_base_url_context: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('files_base_url', default=None)
 
 def get_current_request() -> Optional[Request]:
     """Helper function to get the current request from context"""
     return request_context.get()
 
+def get_files_base_url() -> Optional[str]:
+    """Helper function to get the /files/ base URL of the current request"""
+    return files_base_url_context.get()
+
 def set_current_request(request: Request) -> None:
-    """Helper function to set the current request in context"""
+    """Helper function to set the current request and its /files/ base URL in context"""
     request_context.set(request)
+    base_url = str(request.base_url)
+    if "api.receiptiq.co" in base_url:
+        base_url = base_url.replace("http","https")
+    files_base_url_context.set(f"{base_url}files/")
 
 def generate_reset_token(length: int = 32) -> str:
     """Generate a cryptographically secure reset token"""
     return secrets.token_urlsafe(length)
 
-def hash_token(token: str) -> str:
+def hash_token(token: str) -> bytes:
     """Hash the token for secure storage"""
-    return hashlib.sha256(token.encode()).hexdigest()
+    return hashlib.sha256(token.encode()).digest()
+
+def _copy_upload(src, dst) -> None:
+    """Copy an upload's spooled file into dst, in kernel space via sendfile when both have a file descriptor"""
+    try:
+        # Streams without a descriptor raise io.UnsupportedOperation, an OSError. A spool still in
+        # memory rolls over to disk on fileno(), which costs at most its (small) max_size
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        offset = 0
+        while sent := os.sendfile(dst_fd, src_fd, offset, UPLOAD_CHUNK_SIZE):
+            offset += sent
+    except (AttributeError, OSError):
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
 
 async def save_upload_file(upload_file: UploadFile, project_id: str) -> tuple[str, str]:
     """
@@ -48,10 +77,10 @@ async def save_upload_file(upload_file: UploadFile, project_id: str) -> tuple[st
     file_name = f"{upload_file.filename}"
     file_path = str(upload_dir / file_name)
     
-    # Save the file
+    # Copy the spooled upload straight to disk, off the event loop
+    await upload_file.seek(0)
     with open(file_path, "wb") as f:
-        content = await upload_file.read()
-        f.write(content)
+        await asyncio.to_thread(_copy_upload, upload_file.file, f)
     
     return file_path, file_name
 
@@ -200,7 +229,7 @@ async def verify_paystack_signature(request: Request):
         body,
         hashlib.sha512
     ).hexdigest()
-    if not hash_value == signature:
+    if not hmac.compare_digest(hash_value.encode('utf-8'), signature.encode('utf-8')):
         logger.warning(f"Invalid signature")
         raise HTTPException(status_code=400, detail="Invalid signature")
 
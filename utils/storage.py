@@ -102,7 +102,6 @@ class StorageService:
             config=boto3.session.Config(signature_version='s3v4')
         )
         self.bucket_name = settings.bucket_name
-        self._ensure_bucket_exists()
         try:
             url = self.s3.generate_presigned_url(
                 'get_object',
@@ -124,7 +123,6 @@ class StorageService:
             region_name=settings.aws_region or None
         )
         self.bucket_name = settings.bucket_name
-        self._ensure_bucket_exists()
         try:
             self.s3.delete_object(Bucket=self.bucket_name, Key=object_key)
             return True
@@ -143,7 +141,6 @@ class StorageService:
             region_name=settings.aws_region or None
         )
         self.bucket_name = settings.bucket_name
-        self._ensure_bucket_exists()
         try:
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             self.s3.download_file(self.bucket_name, object_key, local_path)